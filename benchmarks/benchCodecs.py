@@ -0,0 +1,69 @@
+"""
+    Codec benchmark: file size, encode and decode time of a task list with each list codec.
+
+    Run from the repository root: python benchmarks/benchCodecs.py [--sizes 10000 100000] [--repeat N]
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app.listCodecs import codecs, decode
+from app.taskDocument import TaskDocument
+
+
+def makeData(size: int, subtasks: int = 2) -> dict:
+    """
+    Serialized list of size tasks with subtasks each, like the ones of the benchmark suite.
+    """
+    document = TaskDocument(f"codec{size}")
+    for row in range(size):
+        task = document.addTask(f"Task {row}", row % 3 == 0)
+        for sub in range(subtasks):
+            document.addSubtask(task, f"Subtask {sub}", sub == 0)
+    data = document.toDict()
+    data["seq"] = 0
+    return data
+
+
+def bestOf(function, repeat: int) -> float:
+    """
+    Milliseconds of the fastest of repeat calls.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="tasks per list")
+    parser.add_argument("--repeat", type=int, default=5, help="calls per measure, the fastest is kept")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        data = makeData(size)
+        print(f"{size} tasks, {size * 2} subtasks")
+        print(f"{'codec':<14} {'size':>10} {'encode':>12} {'decode':>12} {'load':>12}")
+        baseline = None
+        for codec in codecs.values():
+            raw = codec.encode(data)
+            assert decode(raw) == data, f"{codec.name} does not round trip"
+            encodeTime = bestOf(lambda: codec.encode(data), args.repeat)
+            decodeTime = bestOf(lambda: decode(raw), args.repeat)
+            # What opening the list costs: decoding then building the document
+            loadTime = bestOf(lambda: TaskDocument.fromDict(decode(raw)), args.repeat)
+            baseline = baseline or len(raw)
+            print(f"{codec.name:<14} {len(raw) / 1024:7.0f} KiB {encodeTime:9.1f} ms {decodeTime:9.1f} ms "
+                  f"{loadTime:9.1f} ms  size x{len(raw) / baseline:.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
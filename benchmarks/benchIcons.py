@@ -0,0 +1,86 @@
+"""
+    Icon benchmark: cost of the icons of a task row with qtawesome directly and with the icon cache.
+
+    Run from the repository root: python benchmarks/benchIcons.py [--rows N]
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QRect, QSize
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+from qtawesome import icon
+
+from customWidgets import IconCache
+
+# Icons of one task row: dropdown, rename, add subtask and delete buttons
+ROW_ICONS = ("fa5s.arrow-down", "fa5s.edit", "fa5s.plus", "fa5s.trash")
+
+
+def timeIt(function, repeat: int) -> float:
+    """
+    Microseconds per call of function.
+    """
+    start = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - start) / repeat * 1e6
+
+
+def rowUncached(painter: QPainter) -> None:
+    # What a task widget did: build its icons, then paint them
+    for name in ROW_ICONS:
+        icon(name, color="white").paint(painter, QRect(0, 0, 16, 16))
+
+
+def rowCachedIcons(cache: IconCache, painter: QPainter) -> None:
+    for name in ROW_ICONS:
+        cache.icon(name).paint(painter, QRect(0, 0, 16, 16))
+
+
+def rowCachedPixmaps(cache: IconCache, painter: QPainter) -> None:
+    # What the task delegate does
+    for name in ROW_ICONS:
+        painter.drawPixmap(QRect(0, 0, 16, 16), cache.pixmap(name))
+
+
+def paintOnly(icons: list, painter: QPainter) -> None:
+    for item in icons:
+        item.paint(painter, QRect(0, 0, 16, 16))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000, help="task rows per measure")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    image = QImage(QSize(64, 64), QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    cache = IconCache()
+    rowCachedPixmaps(cache, painter)
+
+    qtawesomeIcons = [icon(name, color="white") for name in ROW_ICONS]
+    results = [
+        ("build + paint, qtawesome", timeIt(lambda: rowUncached(painter), args.rows)),
+        ("paint only, qtawesome icons", timeIt(lambda: paintOnly(qtawesomeIcons, painter), args.rows)),
+        ("build + paint, cached icons", timeIt(lambda: rowCachedIcons(cache, painter), args.rows)),
+        ("build + paint, cached pixmaps", timeIt(lambda: rowCachedPixmaps(cache, painter), args.rows)),
+    ]
+    painter.end()
+
+    print(f"{len(ROW_ICONS)} icons per row, {args.rows} rows")
+    baseline = results[0][1]
+    for label, micros in results:
+        print(f"{label:<32} {micros:9.1f} us/row  x{baseline / micros:6.1f}")
+    print(f"cache: {cache.hits} hits, {cache.misses} misses")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""
+    Headless benchmark suite for Tasker's hot paths.
+
+    Runs with the offscreen Qt platform in a temporary data folder, writes latency
+    percentiles and peak RSS to a JSON file and can compare them to a baseline:
+
+        python benchmarks/benchSuite.py --output results.json
+        python benchmarks/benchSuite.py --baseline results.json --threshold 0.2
+
+    The exit status is 1 when a benchmark regressed against the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+from statistics import fmean
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEvent, QEventLoop, QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication, QWidget
+
+SIZES = (100, 10_000, 100_000)
+QUICK_SIZES = (100, 10_000)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(samples: list[float]) -> dict:
+    """
+    Latency statistics in milliseconds of samples taken in seconds.
+    """
+    milliseconds = [sample * 1000 for sample in samples]
+    return {
+        "count": len(milliseconds),
+        "mean": fmean(milliseconds),
+        "min": min(milliseconds),
+        "p50": percentile(milliseconds, 0.5),
+        "p90": percentile(milliseconds, 0.9),
+        "p99": percentile(milliseconds, 0.99),
+        "max": max(milliseconds),
+        "peakRssKb": peakRss(),
+    }
+
+
+def peakRss() -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def timeCalls(function, repeat: int, setup=None) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        function()
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def makeDocument(name: str, size: int, subtasks: int = 2):
+    from app.taskDocument import TaskDocument
+    document = TaskDocument(name)
+    for row in range(size):
+        task = document.addTask(f"Task {row}", row % 3 == 0)
+        for sub in range(subtasks):
+            document.addSubtask(task, f"Subtask {sub}", sub == 0)
+    document.takeChanges()
+    return document
+
+
+def openList(name: str):
+    """
+    A TaskList with the stored list loaded, the event loop runs until it is shown.
+    """
+    from app.tasksList import TaskList
+    taskList = TaskList(name)
+    loop = QEventLoop()
+    taskList.loaded.connect(loop.quit)
+    taskList.loadFromFile(name)
+    loop.exec_()
+    return taskList
+
+
+def closeList(taskList) -> None:
+    """
+    Delete a TaskList now, its document leaves the registry and the next open parses the file.
+    """
+    taskList.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+
+# --- Benchmarks ---
+
+def benchLoad(size: int, repeat: int) -> list[float]:
+    from app.storage import getStorage
+    storage = getStorage()
+    name = f"load{size}"
+    storage.write(storage.fullSnapshot(makeDocument(name, size)))
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        taskList = openList(name)
+        samples.append(perf_counter() - start)
+        closeList(taskList)
+    return samples
+
+
+def benchSaveEdit(size: int, repeat: int) -> list[float]:
+    """
+    saveToFile after one toggle, the usual autosave.
+    """
+    from app.storage import getStorage
+    storage = getStorage()
+    name = f"save{size}"
+    storage.write(storage.fullSnapshot(makeDocument(name, size)))
+    taskList = openList(name)
+    model = taskList.model
+    index = model.index(0, 0)
+
+    def toggle():
+        model.setChecked(index, not model.tasks[0].done)
+
+    samples = timeCalls(taskList.saveToFile, repeat, setup=toggle)
+    taskList.deleteLater()
+    return samples
+
+
+def benchSaveFull(size: int, repeat: int) -> list[float]:
+    """
+    Write of a whole list, the first save of a list or a compaction.
+    """
+    from app.storage import getStorage
+    storage = getStorage()
+    document = makeDocument(f"full{size}", size)
+    return timeCalls(lambda: storage.write(storage.fullSnapshot(document)), repeat)
+
+
+def benchAddTask(repeat: int) -> list[float]:
+    """
+    Creation of a task row in a shown list of 10k tasks.
+    """
+    from app.tasksList import TaskList
+    taskList = TaskList("rows")
+    taskList.setDocument(makeDocument("rows", 10_000))
+    taskList.resize(800, 600)
+    taskList.show()
+    QApplication.processEvents()
+
+    def addTask():
+        taskList.addTask()
+        QApplication.processEvents()
+
+    samples = timeCalls(addTask, repeat)
+    taskList.saveScheduler.timer.stop()
+    taskList.deleteLater()
+    return samples
+
+
+def benchToggle(repeat: int) -> list[float]:
+    """
+    Check a task: model update, roll-up and progress bar update.
+    """
+    from app.tasksList import TaskList
+    taskList = TaskList("toggle")
+    taskList.setDocument(makeDocument("toggle", 10_000))
+    model = taskList.model
+    index = model.index(0, 0)
+    samples = timeCalls(lambda: model.setChecked(index, not model.tasks[0].done), repeat)
+    taskList.saveScheduler.timer.stop()
+    taskList.deleteLater()
+    return samples
+
+
+def benchBatchDone(repeat: int) -> list[float]:
+    """
+    Check every task of a selection of 10k tasks as one batch.
+    """
+    from app.tasksList import TaskList
+    taskList = TaskList("batch")
+    taskList.setDocument(makeDocument("batch", 10_000))
+    view = taskList.view
+    view.selectAll()
+    samples = timeCalls(lambda: view.setSelectionDone(not taskList.tasks[0].done), repeat)
+    taskList.saveScheduler.timer.stop()
+    taskList.deleteLater()
+    return samples
+
+
+def benchExplorer(lists: int, repeat: int) -> tuple[list[float], list[float]]:
+    """
+    Summary index rebuild from scratch, then explorer opening with a warm index.
+    """
+    from app.storage import getStorage
+    from app.summaryIndex import getSummaryIndex
+    from app.tasksList import TaskListExplorer
+    storage = getStorage()
+    for number in range(lists):
+        storage.write(storage.fullSnapshot(makeDocument(f"list{number}", 10, 1)))
+    index = getSummaryIndex()
+    start = perf_counter()
+    index.rebuild()
+    rebuild = [perf_counter() - start]
+
+    def openExplorer():
+        explorer = TaskListExplorer()
+        explorer.resize(1200, 800)
+        explorer.show()
+        QApplication.processEvents()
+        explorer.deleteLater()
+
+    return rebuild, timeCalls(openExplorer, repeat)
+
+
+def benchSearch(lists: int, repeat: int) -> tuple[int, list[float]]:
+    """
+    Prefix queries on the search index of lists of 10k tasks with 2 subtasks each.
+    """
+    from app.searchIndex import SearchIndex
+    from app.storage import getStorage
+    folder = tempfile.mkdtemp(prefix="searchBench")
+    try:
+        index = SearchIndex(getStorage(), folder=folder)
+        with index.lock:
+            for number in range(lists):
+                document = makeDocument(f"search{number}", 10_000)
+                index.setList(document.name, (0.0, 0), {task.id: task.name for task in document.iterTasks()})
+            index.sortWords()
+        queries = ["task 12", "subtask 1", "99", "task 5000", "ta"]
+        samples = []
+        for _ in range(repeat):
+            for query in queries:
+                start = perf_counter()
+                index.search(query)
+                samples.append(perf_counter() - start)
+        return sum(len(entry["tasks"]) for entry in index.lists.values()), samples
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def benchTabBar(tabs: int, repeat: int) -> list[float]:
+    from customWidgets import CustomTabWidget
+    tabWidget = CustomTabWidget(radius=10, activeColor="#273044", inactiveColor="#181f30", hoverColor="#344058",
+                                borderWidth=8, padding=8, tabHeight=42, tabWidth=140)
+    for number in range(tabs):
+        tabWidget.addTab(QWidget(), f"Tab {number}")
+    tabWidget.resize(tabs * 140, 300)
+    tabWidget.show()
+    QApplication.processEvents()
+    samples = timeCalls(tabWidget.tabBar().repaint, repeat)
+    tabWidget.deleteLater()
+    return samples
+
+
+def runSuite(quick: bool, only: str | None) -> dict:
+    results = {}
+
+    def record(name: str, samples: list[float]) -> None:
+        results[name] = summarize(samples)
+        print(f"{name:<28} p50 {results[name]['p50']:10.3f} ms   p90 {results[name]['p90']:10.3f} ms", flush=True)
+
+    def selected(name: str) -> bool:
+        return only is None or only in name
+
+    for size in QUICK_SIZES if quick else SIZES:
+        repeat = 3 if size >= 100_000 else 10
+        if selected(f"load.{size}"):
+            record(f"load.{size}", benchLoad(size, repeat))
+        if selected(f"saveEdit.{size}"):
+            record(f"saveEdit.{size}", benchSaveEdit(size, repeat * 2))
+        if selected(f"saveFull.{size}"):
+            record(f"saveFull.{size}", benchSaveFull(size, repeat))
+    if selected("addTask"):
+        record("addTask.10000", benchAddTask(50))
+    if selected("toggle"):
+        record("toggle.10000", benchToggle(500))
+    if selected("batchDone"):
+        record("batchDone.10000", benchBatchDone(10))
+    lists = 500 if quick else 5000
+    if selected("explorer") or selected("summaryRebuild"):
+        rebuild, explorer = benchExplorer(lists, 3)
+        record(f"summaryRebuild.{lists}", rebuild)
+        record(f"explorer.{lists}", explorer)
+    if selected("search"):
+        tasks, samples = benchSearch(3 if quick else 10, 20)
+        record(f"search.{tasks}", samples)
+    if selected("tabBarPaint"):
+        record("tabBarPaint.50", benchTabBar(50, 200))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Benchmarks whose p50 or p90 grew by more than threshold (a fraction) over the baseline.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline p50':>13} {'p50':>10} {'change':>8}")
+    for name, stats in results.items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            print(f"{name:<28} {'-':>13} {stats['p50']:10.3f}")
+            continue
+        change = stats["p50"] / reference["p50"] - 1 if reference["p50"] else 0.0
+        worse = [key for key in ("p50", "p90")
+                 if stats[key] > reference[key] * (1 + threshold) and stats[key] - reference[key] > 0.05]
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<28} {reference['p50']:13.3f} {stats['p50']:10.3f} {change:+8.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchResults.json", help="JSON file written with the results")
+    parser.add_argument("--baseline", help="results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 is 20%%")
+    parser.add_argument("--storage", default="journal", help="storage backend: json, journal or sqlite")
+    parser.add_argument("--codec", default="compactJson", help="list codec: json, compactJson or binary")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k tasks and 5000 lists sizes")
+    parser.add_argument("--only", help="run the benchmarks whose name contains this text")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    app = QApplication(sys.argv)
+    workDir = tempfile.mkdtemp(prefix="taskerBench")
+    previousDir = os.getcwd()
+    try:
+        # Storages and settings use paths relative to the working directory
+        os.chdir(workDir)
+        os.makedirs(os.path.join("data", "taskLists"))
+        with open(os.path.join("data", "settings.json"), "w") as file:
+            json.dump({"apparence": {"theme": "dark_blue"}, "storage": {"backend": args.storage, "codec": args.codec}}, file)
+        results = runSuite(args.quick, args.only)
+    finally:
+        os.chdir(previousDir)
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "codec": args.codec,
+            "quick": args.quick,
+        },
+        "peakRssKb": peakRss(),
+        "benchmarks": results,
+    }
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"\nPeak RSS {report['peakRssKb'] / 1024:.1f} MiB, results written to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regression")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QCursor, QKeySequence
 from PyQt5.QtWidgets import (
+    QAbstractItemView,
     QApplication,
     QHBoxLayout,
     QLabel,
+    QMenu,
+    QShortcut,
     QStackedWidget,
     QVBoxLayout,
     QWidget,
-    QScrollArea,
 )
 from qframelesswindow import FramelessMainWindow
 # Local imports
-from customWidgets import CustomTitleBar, SideBar
-from .tasksList import TaskList, TaskListExplorer
+from customWidgets import CustomTitleBar, FadeDriver, SideBar, instrumentation
+from .autosave import SaveScheduler
+from .hibernation import TabHibernator
+from .settings import getSettings
+from .theme import getThemeEngine
+# Task list modules are imported on first use, the welcome tab doesn't need them
 
 class Tasker(FramelessMainWindow):
     """The main application window with VSCode-like layout."""
@@ -23,6 +30,10 @@ class Tasker(FramelessMainWindow):
         self.setWindowTitle("Tasker")
         self.setGeometry(10, 10, 500, 500)
         self.setContentsMargins(0, 0, 0, 0)
+        # Slow machines can turn hover fades and expand animations off
+        settings = getSettings()
+        FadeDriver.reducedMotion = settings.value("apparence.reducedMotion")
+        settings.changed.connect(self.onSettingChanged)
 
         centralWidget = QWidget()
         centralWidget.setObjectName("MainWindowContainer") 
@@ -44,6 +55,7 @@ class Tasker(FramelessMainWindow):
 
         sideBar.homeBtn.clicked.connect(self.addWelcomeTab)
         sideBar.taskListsBtn.clicked.connect(self.showTaskListExplorer)
+        sideBar.searchBtn.clicked.connect(self.showSearchPanel)
         sideBar.taskCheckBtn.clicked.connect(self.settings)
         sideBar.settingsBtn.clicked.connect(self.settings)
         sideBar.addItemBtn.clicked.connect(self.addNewTaskList)
@@ -57,35 +69,66 @@ class Tasker(FramelessMainWindow):
         contentLayout.addWidget(mainContentArea)
         mainLayout.addLayout(contentLayout)
         self.titleBar.tabWidget.tabCloseRequested.connect(self.closeTab)
-        self.applyStylesheet()
+        self.hibernator = TabHibernator(self.titleBar.tabWidget, self)
+        self.explorer = None
+        self.searchPanel = None
+        QShortcut(QKeySequence.StandardKey.Find, self, self.showSearchPanel)
+        self.qtApplication.aboutToQuit.connect(SaveScheduler.flushAll)
+        theme = getThemeEngine()
+        theme.themeChanged.connect(self.applyTheme)
+        theme.apply()
         self.addWelcomeTab()
 
-    def addTaskList(self, taskList : TaskList, name = "Untitled") -> None:
+        if instrumentation.enabled:
+            QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.showDebugPanel)
+
+    def addTaskList(self, taskList : "TaskList", name = "Untitled") -> None:
         # Remove welcome tab if it's the only tab
         if self.titleBar.tabWidget.count() == 1 and self.titleBar.tabWidget.widget(0) == self.welcomeTab:
             self.titleBar.tabWidget.removeTab(0)
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-
-        container = QWidget()
-        container_layout = QVBoxLayout(container)
-        container_layout.addWidget(taskList)
-        scroll.setWidget(container)
-
-        self.titleBar.tabWidget.addTab(scroll, name)
+        # The task view scrolls by itself, no need for a scroll area
+        self.titleBar.tabWidget.addTab(taskList, name)
+        self.hibernator.track(taskList)
 
     def addNewTaskList(self) -> None:
-        taskList = TaskList()
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-
-        container = QWidget()
-        container_layout = QVBoxLayout(container)
-        container_layout.addWidget(taskList)
-        scroll.setWidget(container)
-
-        self.titleBar.tabWidget.addTab(scroll, "Untitled")
+        from .documentRegistry import getDocumentRegistry
+        from .storage import getStorage
+        from .tasksList import TaskList
+        # Lists are identified by name, a new list must not share an open or stored one
+        taken = set(getStorage().listNames()) | set(getDocumentRegistry().documents)
+        name, number = "Untitled", 1
+        while name in taken:
+            number += 1
+            name = f"Untitled {number}"
+        taskList = TaskList(name)
+        self.titleBar.tabWidget.addTab(taskList, name)
+        self.hibernator.track(taskList)
+
+    def openTaskList(self, name: str) -> None:
+        """
+        Focus the tab of a list already open, or open the list in a new tab.
+        """
+        from .tasksList import TaskList
+        tabWidget = self.titleBar.tabWidget
+        for index in range(tabWidget.count()):
+            widget = tabWidget.widget(index)
+            if widget is not self.welcomeTab and getattr(widget, "name", None) == name:
+                tabWidget.setCurrentIndex(index)
+                return
+        taskList = TaskList(name)
+        taskList.loadFromFile(name)
+        self.addTaskList(taskList, name)
+
+    def openTask(self, name: str, taskId: int) -> None:
+        """
+        Open a list, or focus its tab, and scroll to one of its tasks.
+        """
+        self.openTaskList(name)
+        taskList = self.titleBar.tabWidget.currentWidget()
+        showTask = getattr(taskList, "showTask", None)
+        if showTask is not None:
+            showTask(taskId, QAbstractItemView.ScrollHint.PositionAtCenter)
 
     def addWelcomeTab(self) -> None:
         self.welcomeTab = QWidget()
@@ -95,145 +138,17 @@ class Tasker(FramelessMainWindow):
         layout.addWidget(label)
         self.titleBar.tabWidget.addTab(self.welcomeTab, "Welcome")
     
-    def applyStylesheet(self):
-        stylesheet = """
-        #MainWindowContainer {
-            background-color: #273044; 
-        }
-
-        #BtnFrame {
-            background-color: #2a3247;
-            border-radius: 20px;
-        }
-
-        #Sidebar {
-            background-color: #181f30; 
-        }
-
-        #SidebarButton {
-            background-color: transparent;
-            border: none;
-            border-radius: 5px;
-        }
-
-        #SidebarButton:hover {
-            background-color: #4c566a; 
-        }
-
-        #AddItemButton {
-            background-color: #5e81ac; 
-            color: white;
-            font-size: 24px;
-            font-weight: bold;
-            border: none;
-            border-radius: 25px; 
-        }
-
-        #AddItemButton:hover {
-            background-color: #6a9ac9; 
-        }
-
-        /* --- CustomTitleBar --- */
-        #CustomTitlebar {
-            background-color: #181f30; 
-        }
-
-        #CustomTabWidget QTabBar::close-button {
-            border-radius: 6px;
-            image : url("ressources/images/cross.png");
-            padding: 4px;
-            subcontrol-position: right;
-            width: 32px;
-            height: 32px;
-        }
-
-        #CustomTabWidget QTabBar::close-button:hover {
-            background-color: #6a9ac9; 
-        }
-
-        #Icon, #Icon:hover {
-            background-color: #2a3247; 
-            border-radius: 10px; 
-            margin: 10px;
-        }
- 
-        #MinButton, #MaxRestoreButton, #CloseButton {
-            background-color: transparent;
-            color: #eceff4;
-            font-size: 16px;
-            border: none;
-            font-weight: bold;
-        }
-
-        #MinButton:hover, #MaxRestoreButton:hover {
-            background-color: #4c566a;
-        }
-
-        #CloseButton:hover {
-            background-color: #bf616a; 
-        }
-
-        /* Default style */
-        QWidget {
-            background-color: transparent;
-            border: none;
-        }
-
-        QScrollBar:vertical {
-            background: transparent;
-            width: 8px;
-            margin: 0px;
-            border-radius: 4px;
-        }
-
-        QScrollBar::handle:vertical {
-            background: #3f51b5;        
-            min-height: 30px;
-            border-radius: 4px;
-        }
-
-        QScrollBar::handle:vertical:hover {
-            background: #5c6bc0;        
-        }
-
-        QScrollBar::add-line:vertical,
-        QScrollBar::sub-line:vertical {
-            height: 0px;
-        }
-
-        QScrollBar::add-page:vertical,
-        QScrollBar::sub-page:vertical {
-            background: none;
-        }
-
-        QScrollBar:horizontal {
-            background: transparent;
-            height: 8px;
-            margin: 0px;
-            border-radius: 4px;
-        }
-
-        QScrollBar::handle:horizontal {
-            background: #3f51b5;
-            min-width: 30px;
-            border-radius: 4px;
-        }
-
-        QScrollBar::handle:horizontal:hover {
-            background: #5c6bc0;
-        }
-
-        QScrollBar::add-line:horizontal,
-        QScrollBar::sub-line:horizontal {
-            width: 0px;
-        }
-
-        QScrollBar::add-page:horizontal,
-        QScrollBar::sub-page:horizontal {
-            background: none;
-        }
+    def applyTheme(self, name: str) -> None:
+        """
+        Colors of the widgets painting themselves, the stylesheet is set by the theme engine.
         """
-        self.setStyleSheet(stylesheet)
+        theme = getThemeEngine()
+        self.titleBar.tabWidget.tabBar().setColors(theme.color("window"), theme.color("sidebar"),
+                                                    theme.color("tabHover"), theme.color("text"))
+
+    def onSettingChanged(self, key: str, value) -> None:
+        if key == "apparence.reducedMotion":
+            FadeDriver.reducedMotion = value
 
     def closeTab(self, index: int):
         widget = self.titleBar.tabWidget.widget(index)
@@ -242,8 +157,14 @@ class Tasker(FramelessMainWindow):
         if widget == self.welcomeTab and self.titleBar.tabWidget.count() == 1:
             return
 
+        # Task lists write their pending changes before being closed
+        saveToFile = getattr(widget, "saveToFile", None)
+        if saveToFile is not None:
+            saveToFile()
+
         self.titleBar.tabWidget.removeTab(index)
-        if widget:
+        # The explorer and the search panel are kept for the next time they are shown
+        if widget and widget not in (self.explorer, self.searchPanel):
             widget.deleteLater()
 
         # If all task tabs are closed, show the welcome tab again
@@ -256,8 +177,37 @@ class Tasker(FramelessMainWindow):
         self.qtApplication.exec_()
 
     def settings(self) -> None:
-        pass
+        """
+        Pick the application theme.
+        """
+        theme = getThemeEngine()
+        menu = QMenu(self)
+        for name in theme.themes:
+            action = menu.addAction(name.replace("_", " ").title())
+            action.setCheckable(True)
+            action.setChecked(name == theme.name)
+            action.setData(name)
+        action = menu.exec_(QCursor.pos())
+        if action is not None:
+            theme.setTheme(action.data())
+
+    def showDebugPanel(self) -> None:
+        from customWidgets import DebugPanel
+        self.titleBar.tabWidget.addTab(DebugPanel(), "Debug")
+
+    def showSearchPanel(self) -> None:
+        if self.searchPanel is None:
+            from .searchPanel import SearchPanel
+            self.searchPanel = SearchPanel(self)
+            self.searchPanel.openRequested.connect(self.openTask)
+        self.titleBar.tabWidget.addTab(self.searchPanel, "Search")
 
     def showTaskListExplorer(self) -> None:
-        explorer = TaskListExplorer(self)
-        self.titleBar.tabWidget.addTab(explorer, "Explorer")
\ No newline at end of file
+        """
+        Show the explorer, it is built once and kept up to date while its tab is closed.
+        """
+        if self.explorer is None:
+            from .tasksList import TaskListExplorer
+            self.explorer = TaskListExplorer(self)
+        # Focuses the explorer tab when it is already open
+        self.titleBar.tabWidget.addTab(self.explorer, "Explorer")
\ No newline at end of file
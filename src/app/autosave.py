@@ -0,0 +1,88 @@
+"""
+    Autosave module: merges bursts of changes into a single write done on a worker thread.
+"""
+from weakref import WeakSet
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class SaveJob(QRunnable):
+    """
+    Writes one snapshot outside of the GUI thread. Errors are reported to
+    onFailed with the snapshot, an exception escaping run() would abort the app.
+    """
+
+    def __init__(self, write, snapshot, onFailed) -> None:
+        super().__init__()
+        self.write = write
+        self.snapshot = snapshot
+        self.onFailed = onFailed
+
+    def run(self) -> None:
+        try:
+            self.write(self.snapshot)
+        except Exception as e:
+            print(f"Failed to save: {e!r}")
+            self.onFailed(self.snapshot)
+
+
+class SaveScheduler(QObject):
+    """
+    Debounced save: every call to schedule() restarts a quiet period timer,
+    once it elapses a snapshot is taken on the GUI thread and written by a
+    single worker thread, so writes stay ordered and never overlap.
+
+    A failed write emits `writeFailed` with its snapshot on the GUI thread and
+    the save is scheduled again. Owners whose snapshots only hold the changes
+    since the previous one connect to it to put those changes back.
+    """
+    instances: "WeakSet[SaveScheduler]" = WeakSet()
+    writeFailed = pyqtSignal(object)
+
+    def __init__(self, snapshot, write, delay: int = 500, parent: QObject | None = None) -> None:
+        """
+        Args:
+            snapshot (callable): Returns a copy of the data to save, called on the GUI thread.
+            write (callable): Writes a snapshot, called on the worker thread.
+            delay (int): Quiet period in milliseconds before saving.
+        """
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.write = write
+        self.dirty = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.save)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        SaveScheduler.instances.add(self)
+        # Emitted from the worker, delivered on the GUI thread: retried after the quiet period
+        self.writeFailed.connect(self.schedule)
+
+    def flush(self) -> None:
+        """
+        Write pending changes now and wait for every write to be on disk.
+        """
+        self.save()
+        self.pool.waitForDone()
+
+    @classmethod
+    def flushAll(cls) -> None:
+        for scheduler in list(cls.instances):
+            scheduler.flush()
+
+    def save(self) -> None:
+        self.timer.stop()
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.pool.start(SaveJob(self.write, self.snapshot(), self.writeFailed.emit))
+
+    def schedule(self) -> None:
+        """
+        Mark the data as changed, it will be saved after the quiet period.
+        """
+        self.dirty = True
+        self.timer.start()
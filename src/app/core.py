@@ -1,26 +1,58 @@
 """
     Module for managing tsk and json files, for saving and editing tasklists.
 """
-from pathlib import Path
-from json import load
-from os import remove, rename
+from json import dump, load
+from os import fsync, replace
 
 def loadJsonData(jsonPath : str) -> dict:
         with open(jsonPath, "r") as file:
             return load(file)
 
 def listTaskListName() -> list[str]:
-    taskListsFolder = Path("data\\taskLists")
-    return [f.stem for f in taskListsFolder.iterdir() if f.is_file() and f.name.endswith(".json")]
+    from .storage import getStorage
+    return getStorage().listNames()
+
+def loadTaskList(name : str) -> dict | None:
+    """
+    Read the serialized task list, None when it is missing or unreadable.
+    """
+    from .storage import getStorage
+    return getStorage().load(name)
 
 def removeTaskList(name : str) -> None:
-    try:
-        remove(f"data\\taskLists\\{name}.json")
-    except:
-        pass
+    from .storage import getStorage
+    getStorage().remove(name)
 
 def renameTaskList(oldName : str, newName : str) -> None:
-    try:
-        rename(f"data\\taskLists\\{oldName}.json", f"data\\taskLists\\{newName}.json")
-    except:
-        pass
\ No newline at end of file
+    from .storage import getStorage
+    getStorage().rename(oldName, newName)
+
+def saveJsonData(jsonPath : str, data : dict, indent : int | None = 4) -> None:
+        """
+        Write data to a json file atomically, a crash never leaves a half written file.
+        """
+        tempPath = f"{jsonPath}.tmp"
+        with open(tempPath, "w") as file:
+            dump(data, file, indent=indent)
+            file.flush()
+            fsync(file.fileno())
+        replace(tempPath, jsonPath)
+
+def saveFileData(path : str, data : bytes) -> None:
+        """
+        Write bytes to a file atomically, like saveJsonData.
+        """
+        tempPath = f"{path}.tmp"
+        with open(tempPath, "wb") as file:
+            file.write(data)
+            file.flush()
+            fsync(file.fileno())
+        replace(tempPath, path)
+
+def saveTaskList(document) -> None:
+    """
+    Save a TaskDocument synchronously with the current storage.
+    """
+    from .storage import getStorage
+    storage = getStorage()
+    storage.write(storage.snapshot(document))
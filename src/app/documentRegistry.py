@@ -0,0 +1,232 @@
+"""
+    Document registry module: every open task list is parsed once and shared by
+    all the views showing it, with a single model and a single save scheduler.
+"""
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, pyqtSignal
+from .autosave import SaveScheduler
+from .storage import getStorage
+from .searchIndex import getSearchIndex
+from .summaryIndex import getSummaryIndex
+from .taskDocument import TaskDocument
+from .taskModel import TaskModel
+from .workers import runInBackground
+from customWidgets.instrumentation import timed
+
+
+class OpenDocument(QObject):
+    """
+    A task list open in one or more views: its document, the model they share
+    and the scheduler writing its changes. `loaded` is emitted once a load ends,
+    `documentChanged` when the document is replaced or renamed.
+
+    A stored list that can't be read leaves the document unloaded, with the
+    reason in loadError: views stay read-only and nothing is saved under its
+    name, the empty document would replace the stored list.
+    """
+    loaded = pyqtSignal()
+    documentChanged = pyqtSignal()
+
+    def __init__(self, name: str, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.document = TaskDocument(name)
+        self.isLoaded = False
+        self.loadJob = None
+        self.loadError: str | None = None
+        # ids of the views using this document
+        self.views: set[int] = set()
+
+        self.model = TaskModel(self.document, self)
+        self.storage = getStorage()
+        self.summaryIndex = getSummaryIndex()
+        self.searchIndex = getSearchIndex()
+        self.saveScheduler = SaveScheduler(self.snapshot, self.writeSnapshot, parent=self)
+        self.saveScheduler.writeFailed.connect(self.onSaveFailed)
+        self.model.tasksChanged.connect(self.scheduleSave)
+        # Task ids changed or removed by failed writes, None once written
+        self.unsaved: tuple[set[int], set[int]] | None = None
+
+    @property
+    def name(self) -> str:
+        return self.document.name
+
+    def load(self) -> None:
+        """
+        Parse the stored list in the background, a load already running is reused.
+        """
+        if self.loadJob is None:
+            self.loadJob = runInBackground(self.storage.loadDocument, self.name,
+                                           onFinished=self.onLoaded, onFailed=self.onLoadFailed)
+
+    def loadNow(self) -> bool:
+        """
+        Parse the stored list on the calling thread, for edits that can't wait.
+        A background load running is superseded, its views are told it ended.
+        Returns whether the document is loaded, False when the list is unreadable.
+        """
+        if self.isLoaded:
+            return True
+        loading = self.loadJob is not None
+        error = None
+        try:
+            document = self.storage.loadDocument(self.name)
+        except Exception as e:
+            document, error = None, str(e)
+        if document is None and (error is not None or self.storage.exists(self.name)):
+            self.loadJob = None
+            self.failLoad(error or "unreadable file")
+            return False
+        self.setDocument(document if document is not None else TaskDocument(self.name))
+        if loading:
+            self.loaded.emit()
+        return True
+
+    @timed("OpenDocument.onLoaded")
+    def onLoaded(self, document: TaskDocument | None) -> None:
+        if self.loadJob is None or self.sender() is not self.loadJob.signals:
+            # A document was set while loading
+            return
+        self.loadJob = None
+        if document is not None:
+            self.setDocument(document)
+        elif self.storage.exists(self.name):
+            # loadDocument() returns None for unreadable lists too
+            self.failLoad("unreadable file")
+            return
+        self.isLoaded = True
+        self.loadError = None
+        self.loaded.emit()
+
+    def onLoadFailed(self, error: Exception) -> None:
+        if self.loadJob is None or self.sender() is not self.loadJob.signals:
+            return
+        self.loadJob = None
+        self.failLoad(str(error))
+
+    def failLoad(self, error: str) -> None:
+        """
+        Leave the document unloaded and read-only, a later load() tries again.
+        """
+        print(f"Failed to load task list \"{self.name}\": {error}")
+        self.loadError = error
+        self.isLoaded = False
+        self.saveScheduler.dirty = False
+        self.saveScheduler.timer.stop()
+        self.loaded.emit()
+
+    def scheduleSave(self) -> None:
+        if self.loadError is None:
+            self.saveScheduler.schedule()
+
+    def setDocument(self, document: TaskDocument) -> None:
+        self.loadJob = None
+        self.isLoaded = True
+        self.loadError = None
+        self.document = document
+        self.model.setDocument(document)
+        self.documentChanged.emit()
+
+    def rename(self, name: str) -> None:
+        self.document.name = name
+        self.documentChanged.emit()
+
+    def flush(self) -> None:
+        """
+        Write pending changes now.
+        """
+        self.saveScheduler.flush()
+
+    def snapshot(self) -> tuple:
+        document = self.document
+        # Read before the storage takes the changes: names to reindex and removed ids
+        changed, removed = set(document.changed), set(document.removed)
+        if self.unsaved is None:
+            data = self.storage.snapshot(document)
+        else:
+            # The changes taken by the failed writes are lost, the whole list is written
+            changed.update(self.unsaved[0])
+            removed.update(self.unsaved[1])
+            self.unsaved = None
+            data = self.storage.fullSnapshot(document)
+        names = {taskId: document.byId[taskId].name for taskId in changed if taskId in document.byId}
+        return data, self.model.stats.toDict(), (names, removed)
+
+    def onSaveFailed(self, snapshot: tuple) -> None:
+        """
+        Keep what a failed write held for the next one, scheduled by the save scheduler.
+        """
+        _, _, (names, removed) = snapshot
+        changed, allRemoved = self.unsaved or (set(), set())
+        self.unsaved = (changed.union(names), allRemoved.union(removed))
+
+    @timed("OpenDocument.writeSnapshot")
+    def writeSnapshot(self, snapshot: tuple) -> None:
+        """
+        Write a snapshot, the list summary shown by the explorer and the searched
+        task names, runs on the save worker.
+        """
+        data, stats, (names, removed) = snapshot
+        self.storage.write(data)
+        self.summaryIndex.record(data["name"], stats)
+        self.searchIndex.record(data["name"], names, removed)
+
+
+class DocumentRegistry(QObject):
+    """
+    Open documents by list name. Views acquire a document and release it when they
+    go away, the last release writes its pending changes and forgets it.
+    `documentOpened` is emitted with the name of a list opened by a first view.
+    """
+    documentOpened = pyqtSignal(str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.documents: dict[str, OpenDocument] = {}
+
+    def get(self, name: str) -> OpenDocument | None:
+        return self.documents.get(name)
+
+    def acquire(self, name: str, view: QObject) -> OpenDocument:
+        openDocument = self.documents.get(name)
+        if openDocument is None:
+            openDocument = self.documents[name] = OpenDocument(name, self)
+            self.documentOpened.emit(name)
+        openDocument.views.add(id(view))
+        return openDocument
+
+    def release(self, openDocument: OpenDocument, viewId: int) -> None:
+        """
+        Called once per view, further calls are ignored.
+        """
+        if sip.isdeleted(openDocument) or viewId not in openDocument.views:
+            # At exit the registry can go before the views, aboutToQuit flushed it
+            return
+        openDocument.views.discard(viewId)
+        if openDocument.views:
+            return
+        openDocument.flush()
+        SaveScheduler.instances.discard(openDocument.saveScheduler)
+        if self.documents.get(openDocument.name) is openDocument:
+            del self.documents[openDocument.name]
+        openDocument.deleteLater()
+
+    def rename(self, oldName: str, newName: str) -> None:
+        """
+        Follow a list about to be renamed in the storage: its pending changes are
+        written under the old name, then its views save under the new one.
+        """
+        openDocument = self.documents.pop(oldName, None)
+        if openDocument is not None:
+            openDocument.flush()
+            self.documents[newName] = openDocument
+            openDocument.rename(newName)
+
+
+_registry: DocumentRegistry | None = None
+
+
+def getDocumentRegistry() -> DocumentRegistry:
+    global _registry
+    if _registry is None:
+        _registry = DocumentRegistry()
+    return _registry
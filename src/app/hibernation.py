@@ -0,0 +1,235 @@
+"""
+    Hibernation module: background task list tabs are unloaded to a lightweight
+    placeholder and restored when they are shown again.
+"""
+from collections import OrderedDict
+from time import monotonic
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtWidgets import QLabel, QTabWidget, QVBoxLayout, QWidget
+from .settings import getSettings
+
+
+class HibernatedTaskList(QWidget):
+    """
+    Stands in for an unloaded TaskList: its name and the task shown at the top of the view.
+    """
+
+    def __init__(self, name: str, topTaskId: int | None) -> None:
+        super().__init__()
+        self.setObjectName("HibernatedTaskList")
+        self.topTaskId = topTaskId
+        layout = QVBoxLayout(self)
+        self.label = QLabel()
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.label)
+        self.setName(name)
+
+    def setName(self, name: str) -> None:
+        self.name = name
+        self.label.setText(f"Loading {name}...")
+
+
+class TabHibernator(QObject):
+    """
+    Unloads task list tabs left in the background for `hibernateAfter` seconds, and
+    the least recently used ones while more than `maxLoadedLists` lists are loaded
+    or they hold more than `maxResidentTasks` tasks.
+
+    The documents of unloaded lists stay in a warm cache of up to `warmCacheTasks`
+    tasks, restoring one of those is instant, others are loaded again from the storage.
+    A cached document is only valid while the storage stat() of its list is the one
+    it was saved with: lists written by a move into them, or by another process,
+    are loaded again.
+    Limits come from the "tabs" setting.
+    """
+    checkInterval = 30_000
+
+    def __init__(self, tabWidget: QTabWidget, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.tabWidget = tabWidget
+        settings = getSettings()
+        self.applySettings(settings.value("tabs"))
+        settings.changed.connect(self.onSettingChanged)
+        # Loaded task lists by last activation time, least recent first
+        self.lastActive: OrderedDict[QWidget, float] = OrderedDict()
+        # name -> (document, storage stat of the list once it was saved)
+        self.warmCache: OrderedDict[str, tuple] = OrderedDict()
+        self.summaryIndex = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.checkInterval)
+        self.timer.timeout.connect(self.check)
+        self.timer.start()
+        self.tabWidget.currentChanged.connect(self.onCurrentChanged)
+
+    def applySettings(self, settings: dict) -> None:
+        self.hibernateAfter = settings["hibernateAfter"]
+        self.maxResidentTasks = settings["maxResidentTasks"]
+        self.maxLoadedLists = settings["maxLoadedLists"]
+        self.warmCacheTasks = settings["warmCacheTasks"]
+
+    def onSettingChanged(self, key: str, value) -> None:
+        # New limits apply right away
+        if key.startswith("tabs."):
+            self.applySettings(getSettings().value("tabs"))
+            self.check()
+
+    def track(self, taskList: QWidget) -> None:
+        """
+        Start watching a task list shown in a tab.
+        """
+        if self.summaryIndex is None:
+            # Imported with the first task list, the welcome tab doesn't need it
+            from .summaryIndex import getSummaryIndex
+            self.summaryIndex = getSummaryIndex()
+            self.summaryIndex.summaryRemoved.connect(self.forget)
+            self.summaryIndex.summaryRenamed.connect(self.onListRenamed)
+            self.summaryIndex.summaryChanged.connect(self.checkCached)
+            from .documentRegistry import getDocumentRegistry
+            # A list opened elsewhere is edited through its own document from now on
+            getDocumentRegistry().documentOpened.connect(self.dropCached)
+        self.lastActive[taskList] = monotonic()
+        taskList.destroyed.connect(lambda obj=None: self.lastActive.pop(taskList, None))
+        self.check()
+
+    def forget(self, name: str) -> None:
+        """
+        Drop the cached document of a deleted list and close its placeholders,
+        restoring them would show an empty list saved under the deleted name.
+        """
+        self.dropCached(name)
+        for index, placeholder in reversed(self.placeholders(name)):
+            # Closed like any tab, the welcome tab comes back after the last one
+            self.tabWidget.tabCloseRequested.emit(index)
+
+    def onListRenamed(self, oldName: str, newName: str) -> None:
+        """
+        Follow a renamed list: its placeholders restore it under the new name,
+        its cached document saves under it.
+        """
+        cached = self.warmCache.pop(oldName, None)
+        if cached is not None:
+            # Renaming the files keeps their stat
+            cached[0].name = newName
+            self.warmCache[newName] = cached
+        for index, placeholder in self.placeholders(oldName):
+            placeholder.setName(newName)
+            if self.tabWidget.tabText(index) == oldName:
+                self.tabWidget.setTabText(index, newName)
+
+    def placeholders(self, name: str) -> list[tuple[int, HibernatedTaskList]]:
+        widgets = (self.tabWidget.widget(index) for index in range(self.tabWidget.count()))
+        return [(index, widget) for index, widget in enumerate(widgets)
+                if isinstance(widget, HibernatedTaskList) and widget.name == name]
+
+    def onCurrentChanged(self, index: int) -> None:
+        widget = self.tabWidget.widget(index)
+        if isinstance(widget, HibernatedTaskList):
+            widget = self.restore(index, widget)
+        if widget in self.lastActive:
+            self.lastActive[widget] = monotonic()
+            self.lastActive.move_to_end(widget)
+        self.check()
+
+    def check(self) -> None:
+        current = self.tabWidget.currentWidget()
+        now = monotonic()
+        resident = sum(len(taskList.document) for taskList in self.lastActive)
+        loaded = len(self.lastActive)
+        for taskList, lastActive in list(self.lastActive.items()):
+            if taskList is current:
+                continue
+            overLimit = resident > self.maxResidentTasks or loaded > self.maxLoadedLists
+            if (overLimit or now - lastActive > self.hibernateAfter) and self.hibernate(taskList):
+                resident -= len(taskList.document)
+                loaded -= 1
+
+    def hibernate(self, taskList: QWidget) -> bool:
+        """
+        Save a task list and replace its tab by a placeholder.
+        Lists still loading are kept, returns whether the list was unloaded.
+        """
+        index = self.tabWidget.indexOf(taskList)
+        if index == -1 or taskList.loadJob is not None:
+            return False
+        taskList.saveToFile()
+        view = taskList.view
+        top = view.indexAt(view.viewport().rect().topLeft())
+        placeholder = HibernatedTaskList(taskList.name, top.internalPointer().id if top.isValid() else None)
+        if taskList.openDocument.isLoaded:
+            # The placeholder document of an unreadable list is loaded again instead
+            self.cacheDocument(taskList.document)
+
+        current = self.tabWidget.currentIndex()
+        title = self.tabWidget.tabText(index)
+        self.tabWidget.blockSignals(True)
+        self.tabWidget.removeTab(index)
+        self.tabWidget.insertTab(index, placeholder, title)
+        self.tabWidget.setCurrentIndex(current)
+        self.tabWidget.blockSignals(False)
+        self.lastActive.pop(taskList, None)
+        taskList.deleteLater()
+        return True
+
+    def cacheDocument(self, document) -> None:
+        """
+        Keep the document of a list just saved, with the stat of its stored list.
+        """
+        from .storage import getStorage
+        self.warmCache[document.name] = (document, getStorage().stat(document.name))
+        self.warmCache.move_to_end(document.name)
+        cached = sum(len(document) for document, _ in self.warmCache.values())
+        while cached > self.warmCacheTasks and self.warmCache:
+            cached -= len(self.warmCache.popitem(last=False)[1][0])
+
+    def cachedDocument(self, name: str):
+        """
+        Take the cached document of a list, None when there is none or the
+        stored list changed since it was cached.
+        """
+        from .storage import getStorage
+        document, stat = self.warmCache.pop(name, (None, None))
+        if document is None or getStorage().stat(name) != stat:
+            return None
+        return document
+
+    def checkCached(self, name: str) -> None:
+        """
+        Drop the cached document of a list written since it was cached. Our own
+        save of a list being hibernated reports the stat it was cached with.
+        """
+        cached = self.warmCache.get(name)
+        if cached is not None:
+            from .storage import getStorage
+            if getStorage().stat(name) != cached[1]:
+                self.dropCached(name)
+
+    def dropCached(self, name: str) -> None:
+        self.warmCache.pop(name, None)
+
+    def restore(self, index: int, placeholder: HibernatedTaskList) -> QWidget:
+        """
+        Put the task list back in place of its placeholder.
+        """
+        from .tasksList import TaskList
+        # Taken first, opening the list drops it from the cache
+        document = self.cachedDocument(placeholder.name)
+        taskList = TaskList(placeholder.name)
+        title = self.tabWidget.tabText(index)
+        self.tabWidget.blockSignals(True)
+        self.tabWidget.removeTab(index)
+        self.tabWidget.insertTab(index, taskList, title)
+        self.tabWidget.setCurrentIndex(index)
+        self.tabWidget.blockSignals(False)
+        placeholder.deleteLater()
+
+        # A list still open in another tab is already loaded
+        if not taskList.openDocument.isLoaded:
+            if document is not None:
+                taskList.setDocument(document)
+            else:
+                taskList.loadFromFile(placeholder.name)
+        if placeholder.topTaskId is not None:
+            taskList.showTask(placeholder.topTaskId)
+        self.track(taskList)
+        return taskList
@@ -0,0 +1,163 @@
+"""
+    List codecs module: how a serialized task list is turned into file content and back.
+    The format of a file is recognized by its first bytes, whatever the codec that wrote it.
+"""
+import json
+import struct
+import sys
+from array import array
+
+MAGIC = b"TSK"
+
+
+class ListCodec:
+    """
+    Interface of a codec: encode() turns the serialized form of a list
+    (TaskDocument.toDict() plus storage keys) into bytes, decode() reverses it.
+    """
+    name = ""
+    extension = ""
+
+    def encode(self, data: dict) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, raw: bytes) -> dict:
+        raise NotImplementedError
+
+
+class ReadableJsonCodec(ListCodec):
+    """
+    Indented JSON, easy to read and edit by hand, what lists used to be saved as.
+    """
+    name = "json"
+    extension = ".json"
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, indent=4).encode("utf-8")
+
+    def decode(self, raw: bytes) -> dict:
+        return json.loads(raw)
+
+
+class CompactJsonCodec(ReadableJsonCodec):
+    """
+    JSON without indentation nor spaces, about half the size of the readable one.
+    """
+    name = "compactJson"
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class BinaryCodec(ListCodec):
+    """
+    Little endian binary format, stored in .tsk files:
+
+        "TSK" and the format version (1 byte)
+        metadata length (uint32) and metadata: the keys other than "tasks" as JSON
+        string count (uint32), byte length of each string (uint32 each), UTF-8 strings
+        task count (uint32), then one column per field:
+            ids (int64 each), name indexes in the string table (uint32 each),
+            flags (1 byte each: 1 = done, 2 = subtask of the previous task)
+
+    Task names are interned, lists repeating names store each one once. Columns
+    are read and written as whole arrays instead of one struct per task.
+    """
+    name = "binary"
+    extension = ".tsk"
+    version = 1
+    count = struct.Struct("<I")
+    done = 1
+    subtask = 2
+
+    def encode(self, data: dict) -> bytes:
+        strings: dict[str, int] = {}
+        ids, names, flags = array("q"), array("I"), bytearray()
+        for task in data.get("tasks", []):
+            ids.append(task["id"])
+            names.append(strings.setdefault(task["name"], len(strings)))
+            flags.append(self.done if task["done"] else 0)
+            for sub in task.get("subtasks", ()):
+                ids.append(sub["id"])
+                names.append(strings.setdefault(sub["name"], len(strings)))
+                flags.append(self.subtask | (self.done if sub["done"] else 0))
+        encoded = [string.encode("utf-8") for string in strings]
+        lengths = array("I", map(len, encoded))
+        metadata = json.dumps({key: value for key, value in data.items() if key != "tasks"}).encode("utf-8")
+        return b"".join((
+            MAGIC, bytes((self.version,)),
+            self.count.pack(len(metadata)), metadata,
+            self.count.pack(len(encoded)), self.littleEndian(lengths), *encoded,
+            self.count.pack(len(ids)), self.littleEndian(ids), self.littleEndian(names), bytes(flags),
+        ))
+
+    def decode(self, raw: bytes) -> dict:
+        if raw[:len(MAGIC) + 1] != MAGIC + bytes((self.version,)):
+            raise ValueError("Not a version 1 binary task list")
+        view = memoryview(raw)
+        offset = len(MAGIC) + 1
+
+        size, offset = self.readCount(view, offset)
+        data = json.loads(bytes(view[offset:offset + size]))
+        offset += size
+
+        size, offset = self.readCount(view, offset)
+        lengths, offset = self.readArray("I", view, offset, size)
+        strings = []
+        for length in lengths:
+            strings.append(str(view[offset:offset + length], "utf-8"))
+            offset += length
+
+        size, offset = self.readCount(view, offset)
+        ids, offset = self.readArray("q", view, offset, size)
+        names, offset = self.readArray("I", view, offset, size)
+        flags = view[offset:offset + size]
+        if len(flags) != size:
+            raise ValueError("Truncated binary task list")
+
+        tasks = []
+        subtasks = None
+        for taskId, name, flag in zip(ids, names, flags):
+            if flag & self.subtask:
+                if subtasks is not None:
+                    subtasks.append({"id": taskId, "name": strings[name], "done": bool(flag & self.done)})
+                continue
+            subtasks = []
+            tasks.append({"id": taskId, "name": strings[name], "done": bool(flag & self.done), "subtasks": subtasks})
+        data["tasks"] = tasks
+        return data
+
+    @staticmethod
+    def littleEndian(values: array) -> bytes:
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    def readCount(self, view: memoryview, offset: int) -> tuple[int, int]:
+        end = offset + self.count.size
+        if end > len(view):
+            raise ValueError("Truncated binary task list")
+        return self.count.unpack_from(view, offset)[0], end
+
+    @staticmethod
+    def readArray(typecode: str, view: memoryview, offset: int, count: int) -> tuple[array, int]:
+        values = array(typecode)
+        end = offset + count * values.itemsize
+        if end > len(view):
+            raise ValueError("Truncated binary task list")
+        values.frombytes(view[offset:end])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values, end
+
+
+codecs: dict[str, ListCodec] = {codec.name: codec for codec in (ReadableJsonCodec(), CompactJsonCodec(), BinaryCodec())}
+
+def decode(raw: bytes) -> dict:
+    """
+    Serialized task list of a file written by any codec, raises ValueError when unreadable.
+    """
+    if raw.startswith(MAGIC):
+        return codecs["binary"].decode(raw)
+    return codecs["json"].decode(raw)
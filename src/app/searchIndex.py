@@ -0,0 +1,316 @@
+"""
+    Search index module: an inverted index of the task and subtask names of every
+    task list, kept in one file per list so tasks are found without opening their lists.
+"""
+import re
+import threading
+from bisect import bisect_left, insort
+from os import remove, scandir
+from os.path import join
+from pathlib import Path
+from PyQt5.QtCore import QObject, pyqtSignal
+from .autosave import SaveScheduler
+from .core import loadJsonData, saveJsonData
+from .storage import TaskListStorage, getStorage
+from .summaryIndex import getSummaryIndex
+from .workers import runInBackground
+from customWidgets.instrumentation import timed
+
+SEARCH_INDEX_FOLDER = join("data", "searchIndex")
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> set[str]:
+    return set(WORD.findall(text.casefold()))
+
+
+class SearchIndex(QObject):
+    """
+    Words of the task names of every stored list, each mapped to the (list, task id)
+    pairs using it. Words are also kept sorted, the words starting with a prefix
+    are a contiguous range found by bisection.
+
+    Like the summary index, each list is valid as long as its storage stat() is
+    unchanged: the save path updates the tasks it wrote, refresh() loads the files
+    then reindexes the lists changed behind our back, both on a worker thread.
+    Only the files of the lists changed since the previous write are written.
+    """
+    indexed = pyqtSignal()
+    modified = pyqtSignal()
+    version = 1
+
+    def __init__(self, storage: TaskListStorage, folder: str = SEARCH_INDEX_FOLDER, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.storage = storage
+        self.folder = folder
+        self.lock = threading.Lock()
+        # name -> {"mtime", "size", "tasks": {task id: task name}}
+        self.lists: dict[str, dict] = {}
+        # Lists whose file is out of date, written (or removed) by the next writeFile()
+        self.dirty: set[str] = set()
+        self.postings: dict[str, set[tuple[str, int]]] = {}
+        self.words: list[str] = []
+        self.loaded = False
+        self.refreshJob = None
+        self.refreshPending = False
+
+        # The worker copies the dirty lists in writeFile()
+        self.saveScheduler = SaveScheduler(lambda: None, self.writeFile, delay=2000, parent=self)
+        self.modified.connect(self.saveScheduler.schedule)
+        summaryIndex = getSummaryIndex()
+        summaryIndex.summaryChanged.connect(self.onSummaryChanged)
+        summaryIndex.summaryRemoved.connect(self.removeList)
+        summaryIndex.summaryRenamed.connect(self.renameList)
+
+    # --- Queries ---
+
+    @timed("SearchIndex.search")
+    def search(self, text: str, limit: int = 100) -> list[tuple[str, int, str]]:
+        """
+        (list name, task id, task name) of the tasks having, for every word of the
+        text, a word starting with it. At most limit results, ordered by word.
+        """
+        prefixes = tokenize(text)
+        if not prefixes:
+            return []
+        results = []
+        with self.lock:
+            # The prefix matching the fewest tasks is scanned, its tasks are filtered by the others
+            ranges = {prefix: self.wordRange(prefix) for prefix in prefixes}
+            first = min(prefixes, key=lambda prefix: sum(
+                len(self.postings[word]) for word in self.words[slice(*ranges[prefix])]))
+            others = [prefix for prefix in prefixes if prefix != first]
+            seen = set()
+            for word in self.words[slice(*ranges[first])]:
+                for key in self.postings[word]:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    name = self.lists[key[0]]["tasks"][key[1]]
+                    if others and not self.matches(name, others):
+                        continue
+                    results.append((key[0], key[1], name))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def wordRange(self, prefix: str) -> tuple[int, int]:
+        # Words starting with the prefix are contiguous in the sorted words
+        return bisect_left(self.words, prefix), bisect_left(self.words, prefix + "\U0010ffff")
+
+    @staticmethod
+    def matches(name: str, prefixes: list[str]) -> bool:
+        words = tokenize(name)
+        return all(any(word.startswith(prefix) for word in words) for prefix in prefixes)
+
+    # --- Updates ---
+
+    def indexTasks(self, name: str, tasks: dict[int, str], sortWords: bool = True) -> None:
+        """
+        Called with the lock held. Bulk updates pass sortWords=False and call
+        sortWords() once at the end, inserting new words one by one is quadratic.
+        """
+        for taskId, taskName in tasks.items():
+            for word in tokenize(taskName):
+                keys = self.postings.get(word)
+                if keys is None:
+                    keys = self.postings[word] = set()
+                    if sortWords:
+                        insort(self.words, word)
+                keys.add((name, taskId))
+
+    def sortWords(self) -> None:
+        # Called with the lock held
+        self.words = sorted(word for word, keys in self.postings.items() if keys)
+
+    def unindexTasks(self, name: str, tasks: dict[int, str]) -> None:
+        # Called with the lock held, words left without tasks stay until the next load
+        for taskId, taskName in tasks.items():
+            for word in tokenize(taskName):
+                keys = self.postings.get(word)
+                if keys is not None:
+                    keys.discard((name, taskId))
+
+    def setList(self, name: str, stat: tuple[float, int], tasks: dict[int, str]) -> None:
+        # Called with the lock held, by bulk updates
+        entry = self.lists.pop(name, None)
+        if entry is not None:
+            self.unindexTasks(name, entry["tasks"])
+        self.lists[name] = {"mtime": stat[0], "size": stat[1], "tasks": tasks}
+        self.indexTasks(name, tasks, sortWords=False)
+        self.dirty.add(name)
+
+    def record(self, name: str, names: dict[int, str], removed: set[int]) -> None:
+        """
+        Update the tasks of a list that was just written, safe from the save worker.
+        Lists not indexed yet are indexed by a refresh, see onSummaryChanged().
+        """
+        stat = self.storage.stat(name)
+        with self.lock:
+            entry = self.lists.get(name)
+            if entry is None or stat is None:
+                return
+            tasks = entry["tasks"]
+            changed = {taskId: tasks[taskId] for taskId in removed.union(names) if taskId in tasks}
+            self.unindexTasks(name, changed)
+            for taskId in removed:
+                tasks.pop(taskId, None)
+            tasks.update(names)
+            self.indexTasks(name, names)
+            entry["mtime"], entry["size"] = stat
+            self.dirty.add(name)
+        self.modified.emit()
+
+    def onSummaryChanged(self, name: str) -> None:
+        """
+        A list was written: lists created since the index was loaded are indexed
+        from the storage, a save only records the tasks it changed.
+        """
+        with self.lock:
+            unknown = self.loaded and name not in self.lists
+        if unknown:
+            self.refresh()
+
+    def removeList(self, name: str) -> None:
+        with self.lock:
+            entry = self.lists.pop(name, None)
+            if entry is None:
+                return
+            self.unindexTasks(name, entry["tasks"])
+            self.dirty.add(name)
+        self.modified.emit()
+
+    def renameList(self, oldName: str, newName: str) -> None:
+        with self.lock:
+            entry = self.lists.pop(oldName, None)
+            if entry is None:
+                return
+            self.unindexTasks(oldName, entry["tasks"])
+            self.lists[newName] = entry
+            self.indexTasks(newName, entry["tasks"])
+            self.dirty.update((oldName, newName))
+        self.modified.emit()
+
+    def refresh(self) -> None:
+        """
+        Load the index file and reindex the changed lists in the background,
+        `indexed` is emitted once done.
+        """
+        if self.refreshJob is None:
+            self.refreshJob = runInBackground(self.rebuild, onFinished=self.onRefreshed, onFailed=self.onRefreshed)
+        else:
+            self.refreshPending = True
+
+    def onRefreshed(self, result=None) -> None:
+        self.refreshJob = None
+        if self.refreshPending:
+            self.refreshPending = False
+            self.refresh()
+        else:
+            self.indexed.emit()
+
+    @timed("SearchIndex.rebuild")
+    def rebuild(self) -> None:
+        """
+        Drop the deleted lists and reindex the lists whose stat changed, runs on a worker.
+        """
+        if not self.loaded:
+            self.readFile()
+        stats = self.storage.listStats()
+        with self.lock:
+            known = {name: (entry["mtime"], entry["size"]) for name, entry in self.lists.items()}
+        changed = False
+        for name in set(known) - set(stats):
+            self.removeList(name)
+        for name, stat in stats.items():
+            if known.get(name) == tuple(stat):
+                continue
+            document = self.storage.loadDocument(name)
+            if document is None:
+                continue
+            tasks = {task.id: task.name for task in document.iterTasks()}
+            with self.lock:
+                entry = self.lists.get(name)
+                # A save recorded newer tasks while the list was loading
+                if entry is not None and (entry["mtime"], entry["size"]) != known.get(name):
+                    continue
+                self.setList(name, stat, tasks)
+            changed = True
+        if changed:
+            with self.lock:
+                self.sortWords()
+            self.modified.emit()
+
+    # --- Persistence ---
+
+    def path(self, name: str) -> str:
+        return join(self.folder, f"{name}.json")
+
+    def readFile(self) -> None:
+        """
+        Load the lists indexed by a previous session and rebuild their postings.
+        """
+        lists = {}
+        try:
+            with scandir(self.folder) as entries:
+                paths = [entry.path for entry in entries if entry.name.endswith(".json")]
+        except OSError:
+            paths = []
+        for path in paths:
+            try:
+                data = loadJsonData(path)
+            except (OSError, ValueError):
+                continue
+            if data.get("version") == self.version:
+                lists[data["name"]] = data
+        with self.lock:
+            for name, entry in lists.items():
+                tasks = {taskId: taskName for taskId, taskName in entry["tasks"]}
+                self.setList(name, (entry["mtime"], entry["size"]), tasks)
+            self.sortWords()
+            self.dirty.clear()
+            self.loaded = True
+
+    @timed("SearchIndex.writeFile")
+    def writeFile(self, snapshot=None) -> None:
+        """
+        Write the files of the lists changed since the previous call, remove the
+        ones of deleted lists. The lock is held to copy one list at a time.
+        """
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+        Path(self.folder).mkdir(parents=True, exist_ok=True)
+        pending = set(dirty)
+        try:
+            for name in dirty:
+                with self.lock:
+                    entry = self.lists.get(name)
+                    if entry is not None:
+                        entry = {"version": self.version, "name": name, "mtime": entry["mtime"],
+                                 "size": entry["size"], "tasks": list(entry["tasks"].items())}
+                if entry is not None:
+                    saveJsonData(self.path(name), entry, indent=None)
+                else:
+                    try:
+                        remove(self.path(name))
+                    except OSError:
+                        pass
+                pending.discard(name)
+        finally:
+            # Lists not written after a failure are written with the next change
+            if pending:
+                with self.lock:
+                    self.dirty.update(pending)
+
+
+_searchIndex: SearchIndex | None = None
+
+def getSearchIndex() -> SearchIndex:
+    """
+    Search index of the current storage, created on first use.
+    """
+    global _searchIndex
+    if _searchIndex is None:
+        _searchIndex = SearchIndex(getStorage())
+    return _searchIndex
@@ -0,0 +1,81 @@
+"""
+    Search panel module: finds tasks by name in every task list through the search index.
+"""
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QLabel, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+from customWidgets import SectionTitle
+from .searchIndex import getSearchIndex
+
+
+class SearchPanel(QWidget):
+    """
+    Search field and results, each word typed matches the start of a word of the task names.
+    `openRequested` carries the list name and the task id of an activated result.
+    """
+    openRequested = pyqtSignal(str, int)
+    limit = 200
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setObjectName("SearchPanel")
+        self.searchIndex = getSearchIndex()
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(SectionTitle("Search"))
+        self.field = QLineEdit()
+        self.field.setObjectName("SearchField")
+        self.field.setPlaceholderText("Search tasks in every list")
+        self.field.setClearButtonEnabled(True)
+        self.status = QLabel()
+        self.results = QListWidget()
+        self.results.setObjectName("SearchResults")
+        self.results.setUniformItemSizes(True)
+        layout.addWidget(self.field)
+        layout.addWidget(self.status)
+        layout.addWidget(self.results)
+
+        # Searches once typing pauses
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(120)
+        self.searchTimer.timeout.connect(self.search)
+        self.field.textChanged.connect(self.searchTimer.start)
+        self.field.returnPressed.connect(self.openFirst)
+        self.results.itemActivated.connect(self.openItem)
+        self.searchIndex.indexed.connect(self.onIndexed)
+
+        self.status.setText("Indexing task lists...")
+        self.searchIndex.refresh()
+
+    def onIndexed(self) -> None:
+        self.status.setText("")
+        self.search()
+
+    def search(self) -> None:
+        self.searchTimer.stop()
+        self.results.clear()
+        text = self.field.text()
+        if not text.strip():
+            return
+        matches = self.searchIndex.search(text, self.limit)
+        for listName, taskId, taskName in matches:
+            item = QListWidgetItem(f"{taskName}  ·  {listName}")
+            item.setData(Qt.ItemDataRole.UserRole, (listName, taskId))
+            self.results.addItem(item)
+        if self.searchIndex.refreshJob is None:
+            more = "+" if len(matches) == self.limit else ""
+            self.status.setText(f"{len(matches)}{more} result{'s' if len(matches) != 1 else ''}")
+
+    def openFirst(self) -> None:
+        self.search()
+        if self.results.count():
+            self.openItem(self.results.item(0))
+
+    def openItem(self, item: QListWidgetItem) -> None:
+        listName, taskId = item.data(Qt.ItemDataRole.UserRole)
+        self.openRequested.emit(listName, taskId)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.field.setFocus()
+        self.field.selectAll()
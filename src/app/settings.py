@@ -1,22 +1,177 @@
 """
-    Module for manage settings of the app and load json data.
+    Settings module: typed settings of the app, read with dotted keys like "apparence.theme".
+    The settings file is read on first use, not when the module is imported.
 """
-from json.encoder import JSONEncoder
+from copy import deepcopy
+from os.path import exists, join
+from PyQt5.QtCore import QObject, pyqtSignal
+from .autosave import SaveScheduler
+from .core import loadJsonData, saveJsonData
 
-from app.core import loadJsonData
+SETTINGS_PATH = join("data", "settings.json")
+
+# Every known setting with its default, the type of a default is the type of the setting
+DEFAULTS = {
+    "apparence": {
+        "theme": "dark_blue",
+        "reducedMotion": False,
+    },
+    "history": {
+        # Bytes of undo commands kept per open list, the oldest are dropped first
+        "memoryBudget": 8 * 1024 * 1024,
+    },
+    "storage": {
+        "backend": "journal",
+        "codec": "compactJson",
+    },
+    "tabs": {
+        "hibernateAfter": 600,
+        "maxLoadedLists": 8,
+        "maxResidentTasks": 200_000,
+        "warmCacheTasks": 100_000,
+    },
+}
+
+
+class Settings(QObject):
+    """
+    Values of the settings file over the defaults. Sections are read as a whole
+    ("tabs") or one value at a time ("tabs.maxLoadedLists").
+
+    Changes are written by a SaveScheduler: a burst of changes, or several values
+    changed with update(), costs one atomic write on a worker thread. `changed`
+    is emitted with the dotted key and the new value of every changed value.
+    """
+    changed = pyqtSignal(str, object)
+
+    def __init__(self, path: str = SETTINGS_PATH, defaults: dict = DEFAULTS, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.path = path
+        self.defaults = defaults
+        self.values = self.readFile()
+        self.saveScheduler = SaveScheduler(lambda: deepcopy(self.values), self.writeFile, delay=200, parent=self)
+
+    # --- Reading ---
+
+    def value(self, key: str):
+        """
+        Value of a setting or merged section, its default when the file doesn't set it.
+        Raises KeyError for keys neither in the file nor in the defaults.
+        """
+        default = self.lookup(self.defaults, key)
+        value = self.lookup(self.values, key)
+        if value is None:
+            if default is None:
+                raise KeyError(key)
+            return deepcopy(default)
+        if isinstance(default, dict) and isinstance(value, dict):
+            return {**deepcopy(default), **deepcopy(value)}
+        return deepcopy(value)
+
+    @staticmethod
+    def lookup(tree: dict, key: str):
+        for part in key.split("."):
+            if not isinstance(tree, dict) or part not in tree:
+                return None
+            tree = tree[part]
+        return tree
+
+    # --- Changes ---
+
+    def setValue(self, key: str, value) -> None:
+        """
+        Change a setting, a dict changes the values of a section it contains.
+        """
+        self.update({key: value})
+
+    def update(self, values: dict) -> None:
+        """
+        Change several settings at once, they are written together.
+        Raises TypeError when a value doesn't have the type of its default.
+        """
+        changes = {}
+        for key, value in values.items():
+            for leafKey, leafValue in self.leaves(key, value):
+                self.check(leafKey, leafValue)
+                if self.lookup(self.values, leafKey) != leafValue:
+                    changes[leafKey] = leafValue
+        if not changes:
+            return
+        for key, value in changes.items():
+            *sections, name = key.split(".")
+            tree = self.values
+            for section in sections:
+                if not isinstance(tree.get(section), dict):
+                    tree[section] = {}
+                tree = tree[section]
+            tree[name] = deepcopy(value)
+        self.saveScheduler.schedule()
+        for key, value in changes.items():
+            self.changed.emit(key, value)
+
+    def check(self, key: str, value) -> None:
+        default = self.lookup(self.defaults, key)
+        if default is None or isinstance(value, type(default)):
+            return
+        # Whole numbers are fine where a float is expected, not booleans
+        if isinstance(default, float) and isinstance(value, int) and not isinstance(value, bool):
+            return
+        raise TypeError(f"Setting {key} expects {type(default).__name__}, not {type(value).__name__}")
+
+    @classmethod
+    def leaves(cls, key: str, value):
+        if isinstance(value, dict):
+            for name, item in value.items():
+                yield from cls.leaves(f"{key}.{name}", item)
+        else:
+            yield key, value
+
+    def flush(self) -> None:
+        self.saveScheduler.flush()
+
+    # --- Persistence ---
+
+    def readFile(self) -> dict:
+        """
+        Settings of the file, values of the wrong type are dropped for their default.
+        """
+        if not exists(self.path):
+            return {}
+        try:
+            values = loadJsonData(self.path)
+        except ValueError as e:
+            print(f"Unreadable settings file, using the defaults: {e}")
+            return {}
+        for section, sectionValues in list(values.items()):
+            for key, value in list(self.leaves(section, sectionValues)):
+                try:
+                    self.check(key, value)
+                except TypeError as e:
+                    print(e)
+                    *sections, name = key.split(".")
+                    del (self.lookup(values, ".".join(sections)) if sections else values)[name]
+        return values
+
+    def writeFile(self, values: dict) -> None:
+        saveJsonData(self.path, values)
+
+
+_settings: Settings | None = None
+
+def getSettings() -> Settings:
+    """
+    Settings of the app, read on first use.
+    """
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
 
 def getSetting(name : str) -> str | dict | list:
         try:
-            return settings[name]
+            return getSettings().value(name)
         except KeyError:
             print(f"No setting {name} found")
 
 def changeSettings(settingName : str, value : str | dict | list) -> None:
-        settings[settingName] = value
-        with open("data\\settings.json", "w") as file:
-            jsonSettings = encoder.encode(settings)
-            file.write(jsonSettings)
-
-
-encoder = JSONEncoder(indent=4)
-settings : dict = loadJsonData("data\\settings.json")
\ No newline at end of file
+        getSettings().setValue(settingName, value)
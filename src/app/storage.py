@@ -0,0 +1,548 @@
+"""
+    Storage module: where task lists are persisted.
+    TaskList, the explorer and the core helpers only talk to a TaskListStorage,
+    the backend is chosen by the "storage" setting.
+"""
+import json
+import sqlite3
+import threading
+from os import fsync, remove, rename, scandir, stat
+from os.path import exists, join
+from pathlib import Path
+from typing import Iterator
+from customWidgets.instrumentation import timed
+from .core import loadJsonData, saveFileData, saveJsonData
+from .listCodecs import ListCodec, codecs, decode
+from .taskDocument import TaskDocument
+
+TASK_LISTS_FOLDER = join("data", "taskLists")
+DATABASE_PATH = join("data", "tasker.db")
+
+
+class TaskListStorage:
+    """
+    Interface of a task list storage.
+
+    Saving is split in two steps so it can run off the GUI thread:
+    snapshot() copies what has to be written from the document on the GUI thread,
+    write() persists that snapshot and may run on a worker thread.
+    """
+
+    def exportJson(self, name: str, jsonPath: str) -> None:
+        """
+        Write a task list to a JSON file.
+        """
+        data = self.load(name)
+        if data is not None:
+            saveJsonData(jsonPath, data)
+
+    def importJson(self, jsonPath: str) -> str:
+        """
+        Store the content of a JSON task list file, returns the list name.
+        """
+        document = TaskDocument.fromDict(loadJsonData(jsonPath))
+        self.write(self.fullSnapshot(document))
+        return document.name
+
+    def exists(self, name: str) -> bool:
+        return name in self.listNames()
+
+    def fullSnapshot(self, document: TaskDocument):
+        """
+        Snapshot holding the whole document, whatever changed.
+        """
+        document.takeChanges()
+        return document.toDict()
+
+    def listNames(self) -> list[str]:
+        raise NotImplementedError
+
+    def listStats(self) -> dict[str, tuple[float, int]]:
+        """
+        stat() of every list at once, cheaper than one call per list.
+        """
+        return {name: self.stat(name) for name in self.listNames()}
+
+    def load(self, name: str) -> dict | None:
+        """
+        Serialized task list, None when it does not exist.
+        """
+        raise NotImplementedError
+
+    @timed("TaskListStorage.loadDocument")
+    def loadDocument(self, name: str) -> TaskDocument | None:
+        """
+        Task list ready to be edited, None when it does not exist.
+        """
+        data = self.load(name)
+        if data is None:
+            return None
+        document = TaskDocument.fromDict(data)
+        # The storage key wins over the stored name, they differ after a rename
+        document.name = name
+        return document
+
+    def remove(self, name: str) -> None:
+        raise NotImplementedError
+
+    def rename(self, oldName: str, newName: str) -> None:
+        raise NotImplementedError
+
+    def snapshot(self, document: TaskDocument):
+        return self.fullSnapshot(document)
+
+    def stat(self, name: str) -> tuple[float, int] | None:
+        """
+        (modification time, size) of a stored list, None when it does not exist.
+        Any write changes it, caches built from a list are checked against it.
+        """
+        raise NotImplementedError
+
+    def watchPaths(self) -> list[str]:
+        """
+        Paths changed by writes, watched to notice lists changed by other processes.
+        """
+        return []
+
+    def write(self, snapshot) -> None:
+        raise NotImplementedError
+
+
+class JsonStorage(TaskListStorage):
+    """
+    One file per task list, fully rewritten on every save.
+
+    Files are written by the codec of the "storage.codec" setting: readable JSON,
+    compact JSON (.json files) or binary (.tsk files). Any of them is read whatever
+    the codec, a list saved with another codec replaces its file of the old one.
+    """
+
+    def __init__(self, folder: str = TASK_LISTS_FOLDER, codec: str = "compactJson") -> None:
+        self.folder = folder
+        self.codec: ListCodec = codecs.get(codec, codecs["compactJson"])
+        # Extensions of the files a list can be stored in, the one of the codec first
+        self.extensions = [self.codec.extension] + sorted({
+            other.extension for other in codecs.values() if other.extension != self.codec.extension})
+
+    def path(self, name: str) -> str:
+        return join(self.folder, f"{name}{self.codec.extension}")
+
+    def storedPath(self, name: str) -> str | None:
+        """
+        File of a list, whatever the codec that wrote it, None when there is none.
+        """
+        for extension in self.extensions:
+            path = join(self.folder, f"{name}{extension}")
+            if exists(path):
+                return path
+        return None
+
+    def listNames(self) -> list[str]:
+        return list(self.listStats())
+
+    def load(self, name: str) -> dict | None:
+        path = self.storedPath(name)
+        if path is None:
+            print(f"File \"{self.path(name)}\" does not exist.")
+            return None
+        try:
+            with open(path, "rb") as file:
+                return decode(file.read())
+        except ValueError as e:
+            print(f"Failed to read \"{path}\": {e}")
+            return None
+
+    def exists(self, name: str) -> bool:
+        return self.storedPath(name) is not None
+
+    def listStats(self) -> dict[str, tuple[float, int]]:
+        stats = {}
+        # The codec's own files win over stale ones of other codecs
+        for extension in reversed(self.extensions):
+            stats.update(self.scanFolder(extension))
+        return stats
+
+    def scanFolder(self, extension: str) -> dict[str, tuple[float, int]]:
+        """
+        (modification time, size) of the files of the folder with an extension, by list name.
+        """
+        stats = {}
+        try:
+            with scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(extension) and entry.is_file():
+                        result = entry.stat()
+                        stats[entry.name[:-len(extension)]] = (result.st_mtime, result.st_size)
+        except OSError:
+            pass
+        return stats
+
+    def remove(self, name: str) -> None:
+        for extension in self.extensions:
+            try:
+                remove(join(self.folder, f"{name}{extension}"))
+            except OSError:
+                pass
+
+    def rename(self, oldName: str, newName: str) -> None:
+        for extension in self.extensions:
+            try:
+                rename(join(self.folder, f"{oldName}{extension}"), join(self.folder, f"{newName}{extension}"))
+            except OSError:
+                pass
+
+    def stat(self, name: str) -> tuple[float, int] | None:
+        path = self.storedPath(name)
+        if path is None:
+            return None
+        try:
+            result = stat(path)
+        except OSError:
+            return None
+        return result.st_mtime, result.st_size
+
+    def watchPaths(self) -> list[str]:
+        # Saves replace the files, adding, removing or renaming entries of the folder
+        return [self.folder]
+
+    def write(self, snapshot: dict) -> None:
+        name = snapshot["name"]
+        Path(self.folder).mkdir(parents=True, exist_ok=True)
+        saveFileData(self.path(name), self.codec.encode(snapshot))
+        # The file of another codec would be stale from now on
+        for extension in self.extensions[1:]:
+            path = join(self.folder, f"{name}{extension}")
+            if exists(path):
+                remove(path)
+
+
+class SqliteStorage(TaskListStorage):
+    """
+    All task lists in one SQLite database, in WAL mode.
+    Saves only upsert the rows of the tasks that changed since the previous save.
+    """
+    schema = """
+        CREATE TABLE IF NOT EXISTS lists (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            modified REAL NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            list INTEGER NOT NULL REFERENCES lists(id) ON DELETE CASCADE,
+            id INTEGER NOT NULL,
+            parent INTEGER,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            done INTEGER NOT NULL,
+            PRIMARY KEY (list, id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS tasksByParent ON tasks (list, parent, position);
+    """
+
+    def __init__(self, path: str = DATABASE_PATH, importFolder: str | None = TASK_LISTS_FOLDER) -> None:
+        """
+        Args:
+            path (str): Database file.
+            importFolder (str | None): JSON task lists imported when the database is created.
+        """
+        self.path = path
+        self.local = threading.local()
+        # Lists whose rows are all in the database, later saves only send changes
+        self.stored: set[str] = set()
+        created = not exists(path)
+        with self.connection() as db:
+            db.executescript(self.schema)
+        if created and importFolder is not None:
+            folderStorage = JsonStorage(importFolder)
+            for name in folderStorage.listNames():
+                document = folderStorage.loadDocument(name)
+                if document is not None:
+                    self.write(self.fullSnapshot(document))
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Connection of the calling thread, sqlite connections can't be shared between threads.
+        """
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self.local.db = db
+        return db
+
+    def listId(self, db: sqlite3.Connection, name: str, create: bool = False) -> int | None:
+        row = db.execute("SELECT id FROM lists WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return db.execute("INSERT INTO lists (name) VALUES (?)", (name,)).lastrowid
+
+    def listNames(self) -> list[str]:
+        return [row[0] for row in self.connection().execute("SELECT name FROM lists ORDER BY name")]
+
+    # Modification time as a unix timestamp and row count, the database has no per list size
+    statQuery = ("SELECT name, (modified - 2440587.5) * 86400.0, "
+                 "(SELECT count(*) FROM tasks WHERE tasks.list = lists.id) FROM lists")
+
+    def listStats(self) -> dict[str, tuple[float, int]]:
+        return {name: (modified, size) for name, modified, size in self.connection().execute(self.statQuery)}
+
+    def load(self, name: str) -> dict | None:
+        db = self.connection()
+        listId = self.listId(db, name)
+        if listId is None:
+            print(f"Task list \"{name}\" does not exist.")
+            return None
+        tasks, byId = [], {}
+        rows = db.execute("SELECT id, parent, name, done FROM tasks WHERE list = ? "
+                          "ORDER BY parent IS NOT NULL, position", (listId,))
+        for taskId, parent, taskName, done in rows:
+            if parent is None:
+                task = {"id": taskId, "name": taskName, "done": bool(done), "subtasks": []}
+                byId[taskId] = task
+                tasks.append(task)
+            elif parent in byId:
+                byId[parent]["subtasks"].append({"id": taskId, "name": taskName, "done": bool(done)})
+        self.stored.add(name)
+        return {"name": name, "tasks": tasks}
+
+    def exists(self, name: str) -> bool:
+        return self.listId(self.connection(), name) is not None
+
+    def remove(self, name: str) -> None:
+        with self.connection() as db:
+            db.execute("DELETE FROM lists WHERE name = ?", (name,))
+        self.stored.discard(name)
+
+    def rename(self, oldName: str, newName: str) -> None:
+        try:
+            with self.connection() as db:
+                db.execute("UPDATE lists SET name = ? WHERE name = ?", (newName, oldName))
+        except sqlite3.IntegrityError:
+            return
+        if oldName in self.stored:
+            self.stored.discard(oldName)
+            self.stored.add(newName)
+
+    @staticmethod
+    def rows(tasks) -> list[tuple]:
+        return [(task.id, task.parent.id if task.parent is not None else None, task.row, task.name, int(task.done))
+                for task in tasks]
+
+    def fullSnapshot(self, document: TaskDocument) -> dict:
+        document.takeChanges()
+        self.stored.add(document.name)
+        return {"name": document.name, "full": True, "rows": self.rows(document.iterTasks()), "removed": []}
+
+    def snapshot(self, document: TaskDocument) -> dict:
+        if document.name not in self.stored:
+            return self.fullSnapshot(document)
+        changes = document.takeChanges()
+        tasks = (document.byId[taskId] for taskId in changes.changed if taskId in document.byId)
+        return {"name": document.name, "full": False, "rows": self.rows(tasks), "removed": list(changes.removed)}
+
+    def stat(self, name: str) -> tuple[float, int] | None:
+        row = self.connection().execute(self.statQuery + " WHERE name = ?", (name,)).fetchone()
+        return tuple(row[1:]) if row is not None else None
+
+    def watchPaths(self) -> list[str]:
+        # Commits land in the write-ahead log first
+        return [self.path, f"{self.path}-wal"]
+
+    def write(self, snapshot: dict) -> None:
+        with self.connection() as db:
+            listId = self.listId(db, snapshot["name"], create=True)
+            if snapshot["full"]:
+                db.execute("DELETE FROM tasks WHERE list = ?", (listId,))
+            db.executemany("DELETE FROM tasks WHERE list = ? AND id = ?",
+                           ((listId, taskId) for taskId in snapshot["removed"]))
+            db.executemany(
+                "INSERT INTO tasks (list, id, parent, position, name, done) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (list, id) DO UPDATE SET parent = excluded.parent, "
+                "position = excluded.position, name = excluded.name, done = excluded.done",
+                ((listId, *row) for row in snapshot["rows"]))
+            db.execute("UPDATE lists SET modified = julianday('now') WHERE id = ?", (listId,))
+
+
+class JournalStorage(JsonStorage):
+    """
+    Each list is a snapshot (the usual <name>.json or .tsk file) followed by an
+    append-only <name>.journal of operation records, one JSON array per line:
+    [seq, kind, ...]. A save only appends the operations done since the previous one.
+
+    Loading replays the journal over the snapshot. Once a journal grows past
+    compactSize it is folded into a new snapshot by the save worker: the snapshot
+    is replaced atomically first and records it covers are skipped by seq, so a
+    crash at any point loses at most the last, partially written, line.
+    """
+
+    def __init__(self, folder: str = TASK_LISTS_FOLDER, codec: str = "compactJson", compactSize: int = 256 * 1024) -> None:
+        super().__init__(folder, codec)
+        self.compactSize = compactSize
+        self.lock = threading.Lock()
+        # Last sequence number written per list, lists missing here get a full snapshot
+        self.seqs: dict[str, int] = {}
+
+    def journalPath(self, name: str) -> str:
+        return join(self.folder, f"{name}.journal")
+
+    def listStats(self) -> dict[str, tuple[float, int]]:
+        stats = super().listStats()
+        for name, (mtime, size) in self.scanFolder(".journal").items():
+            if name in stats:
+                stats[name] = self.combine(stats[name], (mtime, size))
+        return stats
+
+    @staticmethod
+    def combine(snapshotStat: tuple[float, int], journalStat: tuple[float, int]) -> tuple[float, int]:
+        # Appends only touch the journal, compactions rewrite both files
+        return max(snapshotStat[0], journalStat[0]), snapshotStat[1] + journalStat[1]
+
+    def compact(self, name: str) -> None:
+        """
+        Fold the journal of a list into its snapshot.
+        """
+        with self.lock:
+            document, seq = self.replay(name)
+            if document is None:
+                return
+            data = document.toDict()
+            data["seq"] = seq
+            super().write(data)
+            open(self.journalPath(name), "w").close()
+            self.seqs[name] = seq
+
+    def load(self, name: str) -> dict | None:
+        document = self.loadDocument(name)
+        return document.toDict() if document is not None else None
+
+    def loadDocument(self, name: str) -> TaskDocument | None:
+        with self.lock:
+            document, seq = self.replay(name)
+            if document is not None:
+                self.seqs[name] = seq
+        if document is not None:
+            document.name = name
+        return document
+
+    def readJournal(self, name: str, after: int) -> Iterator[list]:
+        """
+        Records of a list with a sequence number above `after`.
+        A torn last record, left by a crash during an append, is cut off the file.
+        """
+        path = self.journalPath(name)
+        if not exists(path):
+            return
+        with open(path, "rb+") as file:
+            offset = 0
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line)
+                except ValueError:
+                    file.truncate(offset)
+                    break
+                offset += len(line)
+                if record[0] > after:
+                    yield record
+
+    def replay(self, name: str) -> tuple[TaskDocument | None, int]:
+        """
+        Snapshot of a list with its journal applied, and the last applied sequence number.
+        """
+        data = super().load(name)
+        if data is None:
+            return None, 0
+        document = TaskDocument.fromDict(data)
+        seq = data.get("seq", 0)
+        for record in self.readJournal(name, seq):
+            document.apply(record[1:])
+            seq = record[0]
+        document.takeChanges()
+        return document, seq
+
+    def remove(self, name: str) -> None:
+        super().remove(name)
+        try:
+            remove(self.journalPath(name))
+        except OSError:
+            pass
+        self.seqs.pop(name, None)
+
+    def rename(self, oldName: str, newName: str) -> None:
+        super().rename(oldName, newName)
+        try:
+            rename(self.journalPath(oldName), self.journalPath(newName))
+        except OSError:
+            pass
+        if oldName in self.seqs:
+            self.seqs[newName] = self.seqs.pop(oldName)
+
+    def snapshot(self, document: TaskDocument) -> dict:
+        if document.name not in self.seqs:
+            return self.fullSnapshot(document)
+        return {"name": document.name, "operations": document.takeChanges().operations}
+
+    def stat(self, name: str) -> tuple[float, int] | None:
+        snapshotStat = super().stat(name)
+        if snapshotStat is None:
+            return None
+        try:
+            result = stat(self.journalPath(name))
+        except OSError:
+            return snapshotStat
+        return self.combine(snapshotStat, (result.st_mtime, result.st_size))
+
+    def watchPaths(self) -> list[str]:
+        # Appends to a journal leave the folder unchanged, the journals are watched too
+        return [self.folder, *(self.journalPath(name) for name in self.scanFolder(".journal"))]
+
+    def write(self, snapshot: dict) -> None:
+        name = snapshot["name"]
+        if "operations" not in snapshot:
+            with self.lock:
+                seq = self.seqs.get(name, 0)
+                super().write({**snapshot, "seq": seq})
+                open(self.journalPath(name), "w").close()
+                self.seqs[name] = seq
+            return
+        if not snapshot["operations"]:
+            return
+        with self.lock:
+            seq = self.seqs.get(name, 0)
+            lines = []
+            for operation in snapshot["operations"]:
+                seq += 1
+                lines.append(json.dumps([seq, *operation], separators=(",", ":")))
+            with open(self.journalPath(name), "a") as file:
+                file.write("\n".join(lines) + "\n")
+                file.flush()
+                fsync(file.fileno())
+                size = file.tell()
+            self.seqs[name] = seq
+        if size > self.compactSize:
+            self.compact(name)
+
+
+storages: dict[str, type[TaskListStorage]] = {
+    "json": JsonStorage,
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage,
+}
+_storage: TaskListStorage | None = None
+
+def getStorage() -> TaskListStorage:
+    """
+    The storage selected by the "storage" setting, created on first use.
+    """
+    global _storage
+    if _storage is None:
+        from .settings import getSettings
+        settings = getSettings()
+        backend = storages.get(settings.value("storage.backend"), JsonStorage)
+        _storage = backend() if backend is SqliteStorage else backend(codec=settings.value("storage.codec"))
+    return _storage
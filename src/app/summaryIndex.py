@@ -0,0 +1,205 @@
+"""
+    Summary index module: task counts and progress of every task list, kept in one
+    file so the explorer can show them without opening the lists.
+"""
+import threading
+from os.path import exists, join
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+from .autosave import SaveScheduler
+from .core import loadJsonData, saveJsonData
+from .storage import TaskListStorage, getStorage
+from .workers import runInBackground
+
+SUMMARIES_PATH = join("data", "summaries.json")
+
+
+class SummaryIndex(QObject):
+    """
+    Persisted summaries of the stored task lists, by name:
+    {"tasks", "doneTasks", "subtasks", "doneSubtasks", "percent", "mtime", "size"}.
+
+    An entry is valid as long as the storage stat() of its list is unchanged.
+    The save path records a fresh entry after each write, refresh() checks every
+    list in the background and only reloads the ones that changed behind our back.
+    Once watch() is called, changes of the storage files trigger a refresh, bursts
+    of events are coalesced into one.
+    Entries are written from worker threads, signals reach the GUI thread queued.
+    """
+    summaryChanged = pyqtSignal(str)
+    summaryRemoved = pyqtSignal(str)
+    summaryRenamed = pyqtSignal(str, str)
+    listsFound = pyqtSignal(list)
+    modified = pyqtSignal()
+    version = 1
+
+    def __init__(self, storage: TaskListStorage, path: str = SUMMARIES_PATH, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.storage = storage
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict] = self.readFile()
+        self.refreshJob = None
+        self.refreshPending = False
+        self.watcher: QFileSystemWatcher | None = None
+
+        # Quiet period after the last storage change before refreshing
+        self.watchTimer = QTimer(self)
+        self.watchTimer.setSingleShot(True)
+        self.watchTimer.setInterval(300)
+        self.watchTimer.timeout.connect(self.refresh)
+
+        self.saveScheduler = SaveScheduler(self.fileSnapshot, self.writeFile, delay=1000, parent=self)
+        self.modified.connect(self.saveScheduler.schedule)
+
+    # --- Queries ---
+
+    def get(self, name: str) -> dict | None:
+        return self.entries.get(name)
+
+    def names(self) -> list[str]:
+        """
+        Lists known by the index, available before any file is read.
+        """
+        with self.lock:
+            return sorted(self.entries)
+
+    # --- Updates ---
+
+    def record(self, name: str, stats: dict) -> None:
+        """
+        Store the summary of a list that was just written, safe from the save worker.
+        """
+        stat = self.storage.stat(name)
+        if stat is None:
+            return
+        with self.lock:
+            self.entries[name] = {**stats, "mtime": stat[0], "size": stat[1]}
+        self.summaryChanged.emit(name)
+        self.modified.emit()
+
+    def remove(self, name: str) -> None:
+        with self.lock:
+            if self.entries.pop(name, None) is None:
+                return
+        self.summaryRemoved.emit(name)
+        self.modified.emit()
+
+    def rename(self, oldName: str, newName: str) -> None:
+        with self.lock:
+            entry = self.entries.pop(oldName, None)
+            if entry is None:
+                return
+            self.entries[newName] = entry
+        self.summaryRenamed.emit(oldName, newName)
+        self.modified.emit()
+
+    def refresh(self) -> None:
+        """
+        Revalidate every entry in the background. A refresh asked while one is
+        running starts again once it ends, changes made meanwhile are not missed.
+        """
+        if self.refreshJob is None:
+            self.refreshJob = runInBackground(self.rebuild, onFinished=self.onRefreshed, onFailed=self.onRefreshed)
+        else:
+            self.refreshPending = True
+
+    def onRefreshed(self, result=None) -> None:
+        self.refreshJob = None
+        if self.refreshPending:
+            self.refreshPending = False
+            self.refresh()
+
+    def watch(self) -> None:
+        """
+        Refresh whenever the storage changes, including from other processes.
+        """
+        if self.watcher is None:
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.directoryChanged.connect(self.onStorageChanged)
+            self.watcher.fileChanged.connect(self.onStorageChanged)
+        self.watchStorage()
+
+    def watchStorage(self) -> None:
+        """
+        Watch the paths of the storage, files of lists that went away are dropped.
+        """
+        watched = set(self.watcher.directories() + self.watcher.files())
+        wanted = {path for path in self.storage.watchPaths() if exists(path)}
+        if watched - wanted:
+            self.watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self.watcher.addPaths(list(wanted - watched))
+
+    def onStorageChanged(self, path: str) -> None:
+        # Replaced files are no longer watched, and missing paths may exist now
+        self.watchStorage()
+        self.watchTimer.start()
+
+    def rebuild(self) -> None:
+        """
+        Apply the differences between the entries and the storage, runs on a worker:
+        deleted lists are dropped, renamed ones moved and new or changed ones reloaded.
+        """
+        stats = self.storage.listStats()
+        with self.lock:
+            known = {name: (entry["mtime"], entry["size"]) for name, entry in self.entries.items()}
+        removed = set(known) - set(stats)
+        added = sorted(set(stats) - set(known))
+        # A renamed list keeps its modification time and size
+        removedByStat = {known[name]: name for name in removed}
+        for name in added:
+            oldName = removedByStat.pop(tuple(stats[name]), None)
+            if oldName is not None:
+                removed.discard(oldName)
+                self.rename(oldName, name)
+        found = [name for name in added if name not in self.entries]
+        if found:
+            self.listsFound.emit(found)
+        for name in removed:
+            self.remove(name)
+        for name, stat in stats.items():
+            entry = self.entries.get(name)
+            if entry is not None and (entry["mtime"], entry["size"]) == tuple(stat):
+                continue
+            document = self.storage.loadDocument(name)
+            if document is None:
+                continue
+            with self.lock:
+                # A save recorded a newer summary while the list was loading
+                if self.entries.get(name) is not entry:
+                    continue
+                self.entries[name] = {**document.stats.toDict(), "mtime": stat[0], "size": stat[1]}
+            self.summaryChanged.emit(name)
+            self.modified.emit()
+
+    # --- Persistence ---
+
+    def fileSnapshot(self) -> dict:
+        with self.lock:
+            return {"version": self.version, "lists": dict(self.entries)}
+
+    def readFile(self) -> dict[str, dict]:
+        if not exists(self.path):
+            return {}
+        try:
+            data = loadJsonData(self.path)
+        except ValueError:
+            return {}
+        if data.get("version") != self.version:
+            return {}
+        return data.get("lists", {})
+
+    def writeFile(self, snapshot: dict) -> None:
+        saveJsonData(self.path, snapshot, indent=None)
+
+
+_summaryIndex: SummaryIndex | None = None
+
+def getSummaryIndex() -> SummaryIndex:
+    """
+    Summary index of the current storage, created on first use.
+    """
+    global _summaryIndex
+    if _summaryIndex is None:
+        _summaryIndex = SummaryIndex(getStorage())
+    return _summaryIndex
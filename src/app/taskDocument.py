@@ -0,0 +1,312 @@
+"""
+    Task document module: the in-memory content of one task list, independent of Qt.
+    Lists can be loaded, queried, edited and saved without any widget.
+"""
+from typing import Iterator, NamedTuple
+from .task import ProgressStats, SubTask, Task
+
+
+class Changes(NamedTuple):
+    """
+    What happened to a document since the previous save.
+    """
+    changed: set[int]
+    removed: set[int]
+    operations: list[list]
+
+
+class TaskDocument:
+    """
+    Tasks of a list with stable ids, an id index and progress counters.
+    Every edit goes through the document so the index and counters stay in sync.
+    """
+
+    def __init__(self, name: str = "Untitled") -> None:
+        self.name = name
+        self.tasks: list[Task] = []
+        self.byId: dict[int, Task] = {}
+        self.nextId = 1
+        self.stats = ProgressStats()
+        # Edits since the last takeChanges(): touched ids for row level storages,
+        # operations for the journal
+        self.changed: set[int] = set()
+        self.removed: set[int] = set()
+        self.operations: list[list] = []
+
+    def __len__(self) -> int:
+        return len(self.byId)
+
+    # --- Queries ---
+
+    def get(self, taskId: int) -> Task | None:
+        return self.byId.get(taskId)
+
+    def iterTasks(self) -> Iterator[Task]:
+        """
+        Iterate over every task and subtask in display order.
+        """
+        for task in self.tasks:
+            yield task
+            yield from task.subtasks
+
+    def search(self, text: str) -> list[Task]:
+        """
+        Tasks and subtasks whose name contains the text, case insensitive.
+        """
+        text = text.casefold()
+        return [task for task in self.iterTasks() if text in task.name.casefold()]
+
+    # --- Edits ---
+
+    def addSubtask(self, task: Task, name: str = "Subtask", done: bool = False, taskId: int | None = None) -> SubTask:
+        """
+        Append a subtask to a task, the task state follows its subtasks.
+        """
+        sub = SubTask(name, done, self.register(taskId))
+        self.stats.add(task, -1)
+        task.addSubtask(sub)
+        task.syncWithSubtasks()
+        self.stats.add(task)
+        self.byId[sub.id] = sub
+        self.changed.update((task.id, sub.id))
+        self.operations.append(["add", sub.id, task.id, sub.name, sub.done])
+        return sub
+
+    def addTask(self, name: str = "New Task", done: bool = False, taskId: int | None = None) -> Task:
+        """
+        Append a top level task.
+        """
+        task = Task(name, done, self.register(taskId))
+        task.row = len(self.tasks)
+        self.tasks.append(task)
+        self.byId[task.id] = task
+        self.stats.add(task)
+        self.changed.add(task.id)
+        self.operations.append(["add", task.id, None, task.name, task.done])
+        return task
+
+    def register(self, taskId: int | None) -> int:
+        """
+        Reserve an id, keeping the given one when it is still free.
+        """
+        if taskId is None or taskId in self.byId:
+            taskId = self.nextId
+        self.nextId = max(self.nextId, taskId + 1)
+        return taskId
+
+    def removeTask(self, item: Task) -> None:
+        """
+        Delete a task with its subtasks, or a single subtask.
+        """
+        task = item.parent or item
+        self.stats.add(task, -1)
+        if task is not item:
+            task.removeSubtask(item)
+            task.syncWithSubtasks()
+            self.stats.add(task)
+            self.changed.add(task.id)
+            siblings = task.subtasks
+        else:
+            del self.tasks[item.row]
+            for row in range(item.row, len(self.tasks)):
+                self.tasks[row].row = row
+            for sub in item.subtasks:
+                del self.byId[sub.id]
+                self.removed.add(sub.id)
+                self.changed.discard(sub.id)
+            siblings = self.tasks
+        del self.byId[item.id]
+        self.removed.add(item.id)
+        self.changed.discard(item.id)
+        # Following siblings moved up one row
+        self.changed.update(sibling.id for sibling in siblings[item.row:])
+        self.operations.append(["delete", item.id])
+
+    def removeTasks(self, items: list[Task]) -> None:
+        """
+        Delete several tasks and subtasks, top level rows are renumbered a single time.
+        Subtasks of deleted tasks go with them.
+        """
+        taskIds = {item.id for item in items if item.parent is None}
+        for item in {item.id: item for item in items}.values():
+            if item.parent is not None and item.parent.id not in taskIds:
+                self.removeTask(item)
+        if not taskIds:
+            return
+        first = min(self.byId[taskId].row for taskId in taskIds)
+        for taskId in taskIds:
+            task = self.byId.pop(taskId)
+            self.stats.add(task, -1)
+            for sub in task.subtasks:
+                del self.byId[sub.id]
+                self.removed.add(sub.id)
+                self.changed.discard(sub.id)
+            self.removed.add(taskId)
+            self.changed.discard(taskId)
+        self.tasks[first:] = [task for task in self.tasks[first:] if task.id not in taskIds]
+        for row in range(first, len(self.tasks)):
+            self.tasks[row].row = row
+            self.changed.add(self.tasks[row].id)
+        self.operations.append(["deleteMany", sorted(taskIds)])
+
+    def insertTasks(self, entries: list) -> None:
+        """
+        Put serialized tasks back in place, from (parent id, row, Task.toDict())
+        entries whose rows are the final ones, ascending among siblings. Ids are
+        kept when they are free, top level rows are renumbered a single time.
+        """
+        tasks = []
+        for parentId, row, data in entries:
+            if parentId is not None:
+                continue
+            task = Task(data["name"], data["done"], self.register(data["id"]))
+            self.byId[task.id] = task
+            for subData in data.get("subtasks", ()):
+                sub = SubTask(subData["name"], subData["done"], self.register(subData["id"]))
+                task.addSubtask(sub)
+                self.byId[sub.id] = sub
+                self.changed.add(sub.id)
+            self.stats.add(task)
+            tasks.append((row, task))
+        if tasks:
+            first = min(tasks[0][0], len(self.tasks))
+            following = iter(self.tasks[first:])
+            merged = []
+            for row, task in tasks:
+                while first + len(merged) < row:
+                    nextTask = next(following, None)
+                    if nextTask is None:
+                        break
+                    merged.append(nextTask)
+                merged.append(task)
+            merged.extend(following)
+            self.tasks[first:] = merged
+            for row in range(first, len(self.tasks)):
+                self.tasks[row].row = row
+                self.changed.add(self.tasks[row].id)
+
+        for parentId, row, data in entries:
+            parent = self.byId.get(parentId) if parentId is not None else None
+            if parent is None or parent.parent is not None:
+                continue
+            sub = SubTask(data["name"], data["done"], self.register(data["id"]))
+            self.stats.add(parent, -1)
+            parent.insertSubtask(sub, min(row, len(parent.subtasks)))
+            parent.syncWithSubtasks()
+            self.stats.add(parent)
+            self.byId[sub.id] = sub
+            self.changed.add(parent.id)
+            self.changed.update(sibling.id for sibling in parent.subtasks[sub.row:])
+        self.operations.append(["insertMany", entries])
+
+    def moveTask(self, item: Task, row: int) -> None:
+        """
+        Move a task or subtask to another row among its siblings.
+        """
+        siblings = item.parent.subtasks if item.parent is not None else self.tasks
+        row = max(0, min(row, len(siblings) - 1))
+        if row == item.row:
+            return
+        first, last = sorted((row, item.row))
+        del siblings[item.row]
+        siblings.insert(row, item)
+        for index in range(first, last + 1):
+            siblings[index].row = index
+            self.changed.add(siblings[index].id)
+        self.operations.append(["reorder", item.id, row])
+
+    def renameTask(self, item: Task, name: str) -> bool:
+        """
+        Rename a task, empty names are ignored.
+        """
+        name = name.strip()
+        if not name:
+            return False
+        item.name = name
+        self.changed.add(item.id)
+        self.operations.append(["rename", item.id, name])
+        return True
+
+    def setDone(self, item: Task, done: bool) -> None:
+        """
+        Mark a task done/undone, subtasks and parent task follow.
+        """
+        task = item.parent or item
+        self.stats.add(task, -1)
+        if task is not item:
+            task.setSubtaskDone(item, done)
+            task.syncWithSubtasks()
+            self.changed.update((task.id, item.id))
+        else:
+            task.setDone(done)
+            self.changed.add(task.id)
+            self.changed.update(sub.id for sub in task.subtasks)
+        self.stats.add(task)
+        self.operations.append(["toggle", item.id, done])
+
+    def takeChanges(self) -> Changes:
+        """
+        Return the edits since the last call and start a new change set.
+        """
+        changes = Changes(self.changed, self.removed, self.operations)
+        self.changed, self.removed, self.operations = set(), set(), []
+        return changes
+
+    def apply(self, operation: list) -> None:
+        """
+        Replay an operation recorded by this class, unknown targets are skipped.
+        """
+        kind, taskId = operation[0], operation[1]
+        if kind == "deleteMany":
+            self.removeTasks([self.byId[taskId] for taskId in operation[1] if taskId in self.byId])
+            return
+        if kind == "insertMany":
+            self.insertTasks(operation[1])
+            return
+        if kind == "add":
+            parentId, name, done = operation[2:5]
+            if parentId is None:
+                self.addTask(name, done, taskId)
+            elif parentId in self.byId:
+                self.addSubtask(self.byId[parentId], name, done, taskId)
+            return
+        item = self.byId.get(taskId)
+        if item is None:
+            return
+        if kind == "rename":
+            self.renameTask(item, operation[2])
+        elif kind == "toggle":
+            self.setDone(item, operation[2])
+        elif kind == "delete":
+            self.removeTask(item)
+        elif kind == "reorder":
+            self.moveTask(item, operation[2])
+
+    # --- Serialization ---
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "TaskDocument":
+        """
+        Build a document from its serialized form, files without ids get fresh ones.
+        """
+        document = cls(data.get("name", "Unnamed List"))
+        byId = document.byId
+        for row, task_data in enumerate(data.get("tasks", [])):
+            task = Task(task_data.get("name", "Unnamed Task"), task_data.get("done", False),
+                        document.register(task_data.get("id")))
+            task.row = row
+            byId[task.id] = task
+            for sub_data in task_data.get("subtasks", []):
+                sub = SubTask(sub_data.get("name", "Unnamed Subtask"), sub_data.get("done", False),
+                              document.register(sub_data.get("id")))
+                task.addSubtask(sub)
+                byId[sub.id] = sub
+            document.tasks.append(task)
+            document.stats.add(task)
+        return document
+
+    def toDict(self) -> dict:
+        return {
+            "name": self.name,
+            "tasks": [t.toDict() for t in self.tasks]
+        }
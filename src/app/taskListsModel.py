@@ -0,0 +1,103 @@
+"""
+    Task lists model module: the stored task lists and their summaries as a Qt list model.
+"""
+from bisect import bisect_left
+from datetime import datetime
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from .summaryIndex import SummaryIndex
+
+SummaryRole = Qt.ItemDataRole.UserRole
+
+
+class TaskListsModel(QAbstractListModel):
+    """
+    Names of the task lists sorted alphabetically, one row each. Summaries are read
+    from the summary index when a row is painted, only names are stored here.
+    Changes are applied row by row, large batches reset the model instead.
+    """
+    resetThreshold = 100
+
+    def __init__(self, summaryIndex: SummaryIndex, parent=None) -> None:
+        super().__init__(parent)
+        self.summaryIndex = summaryIndex
+        self.names: list[str] = []
+
+    def __contains__(self, name: str) -> bool:
+        return self.row(name) is not None
+
+    # --- QAbstractItemModel interface ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.names[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role == SummaryRole:
+            return self.summaryIndex.get(name)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.toolTip(name, self.summaryIndex.get(name))
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    @staticmethod
+    def toolTip(name: str, summary: dict | None) -> str:
+        if summary is None:
+            return name
+        modified = datetime.fromtimestamp(summary["mtime"]).strftime("%Y-%m-%d %H:%M")
+        return (f"{name}\n"
+                f"Tasks: {summary['doneTasks']}/{summary['tasks']}\n"
+                f"Subtasks: {summary['doneSubtasks']}/{summary['subtasks']}\n"
+                f"Modified: {modified}")
+
+    # --- Updates ---
+
+    def row(self, name: str) -> int | None:
+        row = bisect_left(self.names, name)
+        return row if row < len(self.names) and self.names[row] == name else None
+
+    def addNames(self, names: list[str]) -> None:
+        names = set(names).difference(self.names)
+        if len(names) > self.resetThreshold:
+            self.setNames(self.names + list(names))
+            return
+        for name in names:
+            row = bisect_left(self.names, name)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.names.insert(row, name)
+            self.endInsertRows()
+
+    def removeName(self, name: str) -> None:
+        row = self.row(name)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.names[row]
+        self.endRemoveRows()
+
+    def renameName(self, oldName: str, newName: str) -> None:
+        if self.row(oldName) is None or self.row(newName) is not None:
+            return
+        self.removeName(oldName)
+        self.addNames([newName])
+
+    def setNames(self, names: list[str]) -> None:
+        self.beginResetModel()
+        self.names = sorted(set(names))
+        self.endResetModel()
+
+    def updateName(self, name: str) -> None:
+        """
+        Repaint the row of a list whose summary changed, rows of new lists are added.
+        """
+        row = self.row(name)
+        if row is None:
+            self.addNames([name])
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [SummaryRole, Qt.ItemDataRole.ToolTipRole])
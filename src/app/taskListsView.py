@@ -0,0 +1,175 @@
+"""
+    Task lists view module: the explorer grid, one painted preview per task list.
+"""
+from PyQt5.QtCore import QEvent, QModelIndex, QPoint, QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QCursor, QFont, QPainter
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QListView,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+)
+from customWidgets import cachedPixmap
+from customWidgets.instrumentation import timed
+from .taskListsModel import SummaryRole
+from .theme import getThemeEngine
+
+
+class TaskListDelegate(QStyledItemDelegate):
+    """
+    Paints a task list preview: icon, summary, name and, on hover, the options button.
+    A click on the options button is turned into a signal.
+    """
+    optionsRequested = pyqtSignal(QModelIndex, QPoint)
+
+    previewSize = QSize(125, 95)
+    buttonSize = 32
+    iconSize = 32
+    margin = 8
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.theme = getThemeEngine()
+        self.summaryFont = QFont()
+        self.summaryFont.setPixelSize(11)
+        self.pixmaps = {}
+        self.updateTheme()
+        self.theme.themeChanged.connect(self.updateTheme)
+
+    # --- Geometry ---
+
+    def rects(self, rect: QRect) -> dict[str, QRect]:
+        """
+        Compute the areas of a preview.
+        """
+        inner = rect.adjusted(self.margin, self.margin // 2, -self.margin, -self.margin // 2)
+        size = self.buttonSize
+        icon = QRect(inner.center().x() - self.iconSize // 2, inner.top() + 4, self.iconSize, self.iconSize)
+        summary = QRect(inner.left(), icon.bottom() + 2, inner.width(), 16)
+        options = QRect(inner.right() - size + 1, inner.bottom() - size + 1, size, size)
+        name = QRect(inner.left(), options.top(), options.left() - inner.left(), size)
+        return {"icon": icon, "summary": summary, "options": options, "name": name}
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return self.previewSize
+
+    # --- Painting ---
+
+    @timed("TaskListDelegate.paint")
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rects = self.rects(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        if hovered or option.state & QStyle.StateFlag.State_HasFocus:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.theme.color("surface"))
+            painter.drawRoundedRect(option.rect.adjusted(2, 2, -2, -2), 10, 10)
+
+        painter.drawPixmap(rects["icon"], self.pixmaps["icon"])
+
+        summary = index.data(SummaryRole)
+        if summary is not None:
+            painter.setPen(self.theme.color("mutedText"))
+            painter.setFont(self.summaryFont)
+            painter.drawText(rects["summary"], Qt.AlignmentFlag.AlignCenter,
+                             f"{summary['doneTasks']}/{summary['tasks']} tasks · {summary['percent']}%")
+
+        painter.setPen(self.theme.color("text"))
+        painter.setFont(option.font)
+        nameRect = rects["name"] if hovered else rects["name"].united(rects["options"])
+        text = option.fontMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, nameRect.width())
+        painter.drawText(nameRect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+
+        if hovered:
+            view = option.widget
+            cursor = view.viewport().mapFromGlobal(QCursor.pos()) if view else None
+            if cursor is not None and rects["options"].contains(cursor):
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(self.theme.color("hover"))
+                painter.drawRoundedRect(rects["options"], 10, 10)
+            painter.drawPixmap(rects["options"].adjusted(8, 8, -8, -8), self.pixmaps["options"])
+        painter.restore()
+
+    def updateTheme(self, name: str | None = None) -> None:
+        color = self.theme.value("icon")
+        self.pixmaps = {
+            "icon": cachedPixmap("fa5s.tasks", color, size=self.iconSize),
+            "options": cachedPixmap("fa5s.ellipsis-v", color),
+        }
+        view = self.parent()
+        if isinstance(view, QAbstractItemView):
+            view.viewport().update()
+
+    # --- Interaction ---
+
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() != QEvent.Type.MouseButtonRelease or event.button() != Qt.MouseButton.LeftButton:
+            return False
+        options = self.rects(option.rect)["options"]
+        if not options.contains(event.pos()):
+            return False
+        view = option.widget
+        self.optionsRequested.emit(index, view.viewport().mapToGlobal(options.bottomRight()))
+        return True
+
+
+class TaskListsView(QListView):
+    """
+    Grid of task list previews in icon mode. Previews all have the same size so
+    the layout is computed without asking the delegate, and only the visible ones
+    are painted. The number of columns follows the width of the viewport.
+    """
+    openRequested = pyqtSignal(str)
+    optionsRequested = pyqtSignal(str, QPoint)
+    renameRequested = pyqtSignal(str)
+    deleteRequested = pyqtSignal(str)
+
+    spacing = 10
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setObjectName("TaskListsView")
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover, True)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+
+        self.delegate = TaskListDelegate(self)
+        self.setItemDelegate(self.delegate)
+        size = self.delegate.previewSize
+        self.setGridSize(QSize(size.width() + self.spacing, size.height() + self.spacing))
+
+        # Double click, or Enter on the current preview
+        self.activated.connect(lambda index: self.openRequested.emit(index.data()))
+        self.delegate.optionsRequested.connect(lambda index, pos: self.optionsRequested.emit(index.data(), pos))
+        self.customContextMenuRequested.connect(self.showContextMenu)
+
+    def showContextMenu(self, pos: QPoint) -> None:
+        index = self.indexAt(pos)
+        if index.isValid():
+            self.optionsRequested.emit(index.data(), self.viewport().mapToGlobal(pos))
+
+    def keyPressEvent(self, event) -> None:
+        index = self.currentIndex()
+        if index.isValid() and event.key() == Qt.Key.Key_F2:
+            self.renameRequested.emit(index.data())
+            return
+        if index.isValid() and event.key() == Qt.Key.Key_Delete:
+            self.deleteRequested.emit(index.data())
+            return
+        super().keyPressEvent(event)
+
+    def mouseMoveEvent(self, event) -> None:
+        super().mouseMoveEvent(event)
+        # The options button highlights under the cursor
+        index = self.indexAt(event.pos())
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
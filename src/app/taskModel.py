@@ -0,0 +1,504 @@
+"""
+    Task model module: exposes the tasks of a task list as a Qt item model.
+"""
+from weakref import WeakSet
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
+from customWidgets.instrumentation import timed
+from .settings import getSettings
+from .task import ProgressStats, SubTask, Task
+from .taskDocument import TaskDocument
+from .undoStack import InsertCommand, RemoveCommand, RenameCommand, ReorderCommand, ToggleCommand, UndoStack
+
+
+class TaskModel(QAbstractItemModel):
+    """
+    Two level tree model over a TaskDocument: tasks at the top level, subtasks below them.
+    The document owns the Task objects, views only hold indexes on them.
+
+    Top level rows are exposed incrementally through canFetchMore/fetchMore, in
+    batches growing with the number of rows already shown: a view lays out (and
+    relayouts on every insert or removal) only the rows it has scrolled to.
+    Subtask rows stay hidden from views until their task is first expanded, see
+    fetchChildren() and releaseChildren().
+
+    Batch operations (setCheckedMany, removeTasks, appendTasks) are one change:
+    views are notified per range of rows and tasksChanged is emitted once, so the
+    progress is computed and the list saved a single time.
+
+    Edits are recorded on undoStack as the few values they changed, see undoStack.py.
+    """
+    tasksChanged = pyqtSignal()
+    batchSize = 200
+    # Removals scattered over more ranges of rows reset the views instead
+    resetThreshold = 100
+    itemFlags = (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+                 | Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsUserCheckable)
+
+    def __init__(self, document: TaskDocument | None = None, parent=None) -> None:
+        super().__init__(parent)
+        self.document = document if document is not None else TaskDocument()
+        self.fetched = min(len(self.document.tasks), self.batchSize)
+        # Ids of the tasks whose subtask rows are exposed
+        self.exposed: set[int] = set()
+        # Views showing the model, a list open in several tabs shares its model
+        self.views: WeakSet = WeakSet()
+        # Shared by those views too, edits of any of them are undone in order
+        self.undoStack = UndoStack(self, getSettings().value("history.memoryBudget"))
+
+    # --- QAbstractItemModel interface ---
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = index.internalPointer()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return item.name
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if item.done else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return item.name
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        # Views call this for every row on layout, the flags are built once
+        return self.itemFlags if index.isValid() else Qt.ItemFlag.NoItemFlags
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if parent.isValid():
+            task = parent.internalPointer()
+            return bool(task.subtasks) and task.id not in self.exposed
+        return self.fetched < len(self.document.tasks)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if parent.isValid():
+            self.fetchChildren(parent)
+            return
+        remaining = len(self.document.tasks) - self.fetched
+        if remaining <= 0:
+            return
+        count = min(remaining, max(self.batchSize, self.fetched))
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def fetchAll(self) -> None:
+        """
+        Expose every top level row.
+        """
+        while self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def fetchChildren(self, parent: QModelIndex) -> None:
+        """
+        Expose the subtask rows of a task, views should call it before expanding
+        the task: rows added under a collapsed task don't relayout the view.
+        """
+        task = parent.internalPointer()
+        if task.id in self.exposed:
+            return
+        if task.subtasks:
+            self.beginInsertRows(parent, 0, len(task.subtasks) - 1)
+            self.exposed.add(task.id)
+            self.endInsertRows()
+        else:
+            self.exposed.add(task.id)
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self.document.tasks)
+        return bool(parent.internalPointer().subtasks)
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if parent.isValid():
+            # Subtasks have an empty tuple of subtasks, no type check needed
+            task = parent.internalPointer()
+            siblings = task.subtasks
+            count = len(siblings) if task.id in self.exposed else 0
+        else:
+            siblings = self.document.tasks
+            count = self.fetched
+        if column != 0 or not 0 <= row < count:
+            return QModelIndex()
+        return self.createIndex(row, 0, siblings[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        task = index.internalPointer().parent
+        if task is None:
+            return QModelIndex()
+        return self.createIndex(task.row, 0, task)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return self.fetched
+        task = parent.internalPointer()
+        return len(task.subtasks) if task.id in self.exposed else 0
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid():
+            return False
+        if role == Qt.ItemDataRole.EditRole:
+            return self.renameTask(index, str(value))
+        if role == Qt.ItemDataRole.CheckStateRole:
+            self.setChecked(index, value == Qt.CheckState.Checked or value is True)
+            return True
+        return False
+
+    # --- Task operations ---
+    # Public operations take indexes of the views and record undo commands,
+    # the ...Id(s) variants are what the commands replay.
+
+    def addSubtask(self, parent: QModelIndex, name: str = "Subtask") -> QModelIndex:
+        """
+        Append a subtask to the task at the given index.
+        """
+        self.fetchChildren(parent)
+        task = parent.internalPointer()
+        row = len(task.subtasks)
+        done = task.done
+        self.beginInsertRows(parent, row, row)
+        sub = self.document.addSubtask(task, name)
+        self.endInsertRows()
+        if task.done != done:
+            self.dataChanged.emit(parent, parent, [Qt.ItemDataRole.CheckStateRole])
+        self.undoStack.push(InsertCommand([(task.id, row, sub.toDict())], [] if row else [(task.id, done)]))
+        self.tasksChanged.emit()
+        return self.index(row, 0, parent)
+
+    @timed("TaskModel.addTask")
+    def addTask(self, name: str = "New Task") -> QModelIndex:
+        """
+        Append a top level task. Returns its index, invalid while the rows before
+        it aren't exposed: fetchMore() exposes it once a view scrolls to the end.
+        """
+        row = len(self.tasks)
+        shown = self.fetched == row
+        if shown:
+            self.beginInsertRows(QModelIndex(), row, row)
+        task = self.document.addTask(name)
+        if shown:
+            self.fetched += 1
+            self.endInsertRows()
+        self.undoStack.push(InsertCommand([(None, row, task.toDict())]))
+        self.tasksChanged.emit()
+        return self.index(row, 0)
+
+    @timed("TaskModel.appendTasks")
+    def appendTasks(self, tasks: list[dict]) -> list[int]:
+        """
+        Append serialized tasks (Task.toDict()) at the end of the list, their ids
+        are kept when they are free. Returns the ids they got.
+        """
+        if not tasks:
+            return []
+        # Rows past the fetched ones are exposed later by fetchMore
+        shown = self.fetched == len(self.tasks)
+        row = len(self.tasks)
+        if shown:
+            self.beginInsertRows(QModelIndex(), row, row + len(tasks) - 1)
+        added = []
+        for data in tasks:
+            task = self.document.addTask(data["name"], data["done"], data["id"])
+            for sub in data.get("subtasks", ()):
+                self.document.addSubtask(task, sub["name"], sub["done"], sub["id"])
+            added.append(task)
+        if shown:
+            self.fetched += len(tasks)
+            self.endInsertRows()
+        self.undoStack.push(InsertCommand([(None, task.row, task.toDict()) for task in added]))
+        self.tasksChanged.emit()
+        return [task.id for task in added]
+
+    @timed("TaskModel.insertEntries")
+    def insertEntries(self, entries: list) -> None:
+        """
+        Put serialized tasks back at their rows, see TaskDocument.insertTasks().
+        """
+        if not entries:
+            return
+        # Subtasks after the tasks they may belong to, rows ascending among siblings
+        entries = sorted(entries, key=lambda entry: (entry[0] is not None, entry[1]))
+        # Tasks getting their first subtasks, their state follows them until undone
+        parents = {self.document.get(parentId) for parentId, _, _ in entries if parentId is not None}
+        parentStates = [(parent.id, parent.done) for parent in parents if parent is not None and not parent.subtasks]
+        if len(entries) > self.resetThreshold:
+            self.beginResetModel()
+            self.fetched += sum(1 for parentId, row, _ in entries if parentId is None and row < self.fetched)
+            self.document.insertTasks(entries)
+            self.endResetModel()
+        else:
+            for entry in entries:
+                parentId, row, data = entry
+                parent = self.document.get(parentId) if parentId is not None else None
+                if parentId is not None and parent is None:
+                    continue
+                siblings = parent.subtasks if parent is not None else self.tasks
+                row = min(row, len(siblings))
+                if parent is None and (row < self.fetched or self.fetched == len(self.tasks)):
+                    self.beginInsertRows(QModelIndex(), row, row)
+                    self.document.insertTasks([entry])
+                    self.fetched += 1
+                    self.endInsertRows()
+                elif parent is not None and self.isShown(parent) and parent.id in self.exposed:
+                    done = parent.done
+                    self.beginInsertRows(self.indexOf(parent), row, row)
+                    self.document.insertTasks([entry])
+                    self.endInsertRows()
+                    if parent.done != done:
+                        self.emitChecked(parent)
+                else:
+                    self.document.insertTasks([entry])
+        self.undoStack.push(InsertCommand(entries, parentStates))
+        self.tasksChanged.emit()
+
+    def indexOf(self, item: Task) -> QModelIndex:
+        return self.createIndex(item.row, 0, item)
+
+    def isShown(self, item: Task) -> bool:
+        """
+        Whether views have a row for the task.
+        """
+        if item.parent is None:
+            return item.row < self.fetched
+        return item.parent.id in self.exposed and item.parent.row < self.fetched
+
+    def isSubtask(self, index: QModelIndex) -> bool:
+        return index.isValid() and isinstance(index.internalPointer(), SubTask)
+
+    def moveTask(self, index: QModelIndex, row: int) -> None:
+        """
+        Move a task or subtask to another row among its siblings.
+        """
+        if index.isValid():
+            self.moveItem(index.internalPointer(), row)
+
+    def moveId(self, taskId: int, row: int) -> None:
+        item = self.document.get(taskId)
+        if item is not None:
+            self.moveItem(item, row)
+
+    def moveItem(self, item: Task, row: int) -> None:
+        siblings = item.parent.subtasks if item.parent is not None else self.tasks
+        row = max(0, min(row, len(siblings) - 1))
+        oldRow = item.row
+        if row == oldRow:
+            return
+        parent = self.indexOf(item.parent) if item.parent is not None else QModelIndex()
+        if self.isShown(item) and row < self.rowCount(parent):
+            # Qt expects the destination in the numbering before the move
+            destination = row + 1 if row > oldRow else row
+            self.beginMoveRows(parent, oldRow, oldRow, parent, destination)
+            self.document.moveTask(item, row)
+            self.endMoveRows()
+        elif not self.isShown(item) and row >= self.rowCount(parent):
+            self.document.moveTask(item, row)
+        else:
+            # Between a shown row and one past the fetched rows
+            self.beginResetModel()
+            self.document.moveTask(item, row)
+            self.endResetModel()
+        self.undoStack.push(ReorderCommand(item.id, oldRow, row))
+        self.tasksChanged.emit()
+
+    def removeTask(self, index: QModelIndex) -> None:
+        """
+        Delete the task or subtask at the given index.
+        """
+        if index.isValid():
+            self.removeItems([index.internalPointer()])
+
+    def removeTasks(self, indexes: list[QModelIndex]) -> None:
+        """
+        Delete the tasks and subtasks at the given indexes as one change.
+        """
+        self.removeItems(self.itemsOf(indexes))
+
+    def removeIds(self, taskIds: list[int]) -> None:
+        items = [self.document.get(taskId) for taskId in taskIds]
+        self.removeItems([item for item in items if item is not None])
+
+    @timed("TaskModel.removeItems")
+    def removeItems(self, items: list[Task]) -> None:
+        if not items:
+            return
+        removedEntries = self.entriesOf(items)
+        parents = {item.parent: item.parent.done for item in items if item.parent is not None}
+        # Rows views show, by parent task (None for the top level), the others only leave the document
+        shown: dict[Task | None, list[int]] = {}
+        hidden = []
+        for item in items:
+            parent = item.parent
+            if parent is None and item.row < self.fetched or parent is not None and parent.id in self.exposed:
+                shown.setdefault(parent, []).append(item.row)
+            else:
+                hidden.append(item)
+        ranges = []
+        for parent, rows in shown.items():
+            rows.sort()
+            first = previous = rows[0]
+            for row in rows[1:]:
+                if row != previous + 1:
+                    ranges.append((parent, first, previous))
+                    first = row
+                previous = row
+            ranges.append((parent, first, previous))
+
+        if len(ranges) > self.resetThreshold:
+            self.beginResetModel()
+            self.fetched -= len(shown.get(None, ()))
+            self.document.removeTasks(items)
+            self.exposed.difference_update(item.id for item in items)
+            self.endResetModel()
+        else:
+            self.document.removeTasks(hidden)
+            # Bottom up, the rows of the next ranges stay valid
+            for parent, first, last in sorted(ranges, key=lambda entry: entry[1], reverse=True):
+                siblings = parent.subtasks if parent is not None else self.tasks
+                removed = siblings[first:last + 1]
+                self.beginRemoveRows(self.indexOf(parent) if parent is not None else QModelIndex(), first, last)
+                self.document.removeTasks(removed)
+                if parent is None:
+                    self.fetched -= len(removed)
+                    self.exposed.difference_update(item.id for item in removed)
+                self.endRemoveRows()
+        for parent, done in parents.items():
+            if parent.done != done and self.document.get(parent.id) is parent and self.isShown(parent):
+                self.emitChecked(parent)
+        self.undoStack.push(RemoveCommand(removedEntries))
+        self.tasksChanged.emit()
+
+    @staticmethod
+    def entriesOf(items: list[Task]) -> list:
+        """
+        (parent id, row, Task.toDict()) of tasks, in the order they can be inserted back.
+        """
+        entries = [(item.parent.id if item.parent is not None else None, item.row, item.toDict()) for item in items]
+        entries.sort(key=lambda entry: (entry[0] is not None, entry[1]))
+        return entries
+
+    def renameTask(self, index: QModelIndex, name: str) -> bool:
+        """
+        Commit a renaming change, empty names are ignored.
+        """
+        return index.isValid() and self.renameItem(index.internalPointer(), name)
+
+    def renameId(self, taskId: int, name: str) -> None:
+        item = self.document.get(taskId)
+        if item is not None:
+            self.renameItem(item, name)
+
+    def renameItem(self, item: Task, name: str) -> bool:
+        oldName = item.name
+        if not self.document.renameTask(item, name):
+            return False
+        if self.isShown(item):
+            index = self.indexOf(item)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        self.undoStack.push(RenameCommand(item.id, oldName, item.name))
+        self.tasksChanged.emit()
+        return True
+
+    def setChecked(self, index: QModelIndex, done: bool) -> None:
+        """
+        Mark a task done/undone, subtasks and parent task follow.
+        """
+        self.setStates([(index.internalPointer(), done)])
+
+    def setCheckedMany(self, indexes: list[QModelIndex], done: bool) -> None:
+        """
+        Mark the tasks at the given indexes done/undone as one change.
+        """
+        self.setStates([(item, done) for item in self.itemsOf(indexes)])
+
+    def setIdStates(self, states: list[tuple[int, bool]]) -> None:
+        items = ((self.document.get(taskId), done) for taskId, done in states)
+        self.setStates([(item, done) for item, done in items if item is not None])
+
+    @timed("TaskModel.setStates")
+    def setStates(self, states: list[tuple[Task, bool]]) -> None:
+        """
+        Mark tasks done/undone in order, views are notified once per range of rows.
+        """
+        if not states:
+            return
+        # A task sets its subtasks, their states are what undo restores
+        before = []
+        for item, done in states:
+            if item.subtasks:
+                before.extend((sub.id, sub.done) for sub in item.subtasks)
+            else:
+                before.append((item.id, item.done))
+            self.document.setDone(item, done)
+        tasks = {item.parent or item for item, _ in states}
+        rows = [task.row for task in tasks if task.row < self.fetched]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), 0),
+                                  [Qt.ItemDataRole.CheckStateRole])
+        for task in tasks:
+            if task.subtasks and task.id in self.exposed and task.row < self.fetched:
+                index = self.indexOf(task)
+                self.dataChanged.emit(self.index(0, 0, index),
+                                      self.index(len(task.subtasks) - 1, 0, index),
+                                      [Qt.ItemDataRole.CheckStateRole])
+        self.undoStack.push(ToggleCommand(before, [(item.id, done) for item, done in states]))
+        self.tasksChanged.emit()
+
+    @staticmethod
+    def itemsOf(indexes: list[QModelIndex]) -> list[Task]:
+        """
+        Tasks at the given indexes, without the subtasks of tasks also given.
+        """
+        items = {index.internalPointer() for index in indexes if index.isValid()}
+        return [item for item in items if item.parent is None or item.parent not in items]
+
+    def emitChecked(self, task: Task) -> None:
+        """
+        Notify views that a task and its subtasks may have changed state.
+        """
+        index = self.indexOf(task)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        if task.subtasks and task.id in self.exposed:
+            self.dataChanged.emit(self.index(0, 0, index),
+                                  self.index(len(task.subtasks) - 1, 0, index),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+    def releaseChildren(self, parent: QModelIndex) -> None:
+        """
+        Hide the subtask rows of a collapsed task again, the subtasks stay in the document.
+        """
+        task = parent.internalPointer()
+        if task.id not in self.exposed:
+            return
+        if task.subtasks:
+            self.beginRemoveRows(parent, 0, len(task.subtasks) - 1)
+            self.exposed.discard(task.id)
+            self.endRemoveRows()
+        else:
+            self.exposed.discard(task.id)
+
+    # --- Document ---
+
+    @timed("TaskModel.setDocument")
+    def setDocument(self, document: TaskDocument) -> None:
+        """
+        Show another document, views are reset.
+        """
+        self.beginResetModel()
+        self.document = document
+        self.fetched = min(len(document.tasks), self.batchSize)
+        self.exposed = set()
+        self.endResetModel()
+        # Commands of the previous document would replay on ids of another one
+        self.undoStack.clear()
+
+    @property
+    def stats(self) -> ProgressStats:
+        return self.document.stats
+
+    @property
+    def tasks(self) -> list[Task]:
+        return self.document.tasks
@@ -0,0 +1,395 @@
+"""
+    Task view module: the tree view and delegate painting tasks of a TaskModel.
+"""
+from time import monotonic
+from PyQt5.QtCore import QEvent, QModelIndex, QPointF, QRect, QSize, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QCursor, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QLineEdit,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QTreeView,
+    QWidget,
+)
+from customWidgets import FadeDriver, cachedPixmap, fadeDriver
+from customWidgets.instrumentation import timed
+from .task import Task
+from .theme import getThemeEngine
+
+
+class TaskDelegate(QStyledItemDelegate):
+    """
+    Paints a task row: dropdown, checkbox, label and the hover buttons
+    (rename, add sub-task, delete). Clicks on those areas are turned into signals.
+    """
+    addSubtaskRequested = pyqtSignal(QModelIndex)
+    deleteRequested = pyqtSignal(QModelIndex)
+    renameRequested = pyqtSignal(QModelIndex)
+    toggleExpandRequested = pyqtSignal(QModelIndex)
+
+    rowHeight = 48
+    buttonSize = 32
+    checkboxSize = 20
+    margin = 10
+    spacing = 6
+
+    glyphs = {
+        "rename": "fa5s.edit",
+        "add": "fa5s.plus",
+        "delete": "fa5s.trash",
+        "expand": "fa5s.arrow-down",
+        "collapse": "fa5s.arrow-up",
+    }
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.theme = getThemeEngine()
+        self.fades = fadeDriver()
+        self.pixmaps = {}
+        self.updateTheme()
+        self.theme.themeChanged.connect(self.updateTheme)
+
+    # --- Geometry ---
+
+    def buttonRects(self, rect: QRect, isSubtask: bool) -> dict[str, QRect]:
+        """
+        Compute the clickable areas of a row.
+        """
+        size = self.buttonSize
+        top = rect.top() + (rect.height() - size) // 2
+        rects = {}
+        x = rect.left() + self.margin
+        if not isSubtask:
+            rects["dropdown"] = QRect(x, top, size, size)
+            x += size + self.spacing
+        boxTop = rect.top() + (rect.height() - self.checkboxSize) // 2
+        rects["checkbox"] = QRect(x, boxTop, self.checkboxSize, self.checkboxSize)
+        x += self.checkboxSize + self.margin
+
+        right = rect.right() - self.margin
+        actions = ["rename", "delete"] if isSubtask else ["rename", "add", "delete"]
+        for name in reversed(actions):
+            rects[name] = QRect(right - size + 1, top, size, size)
+            right -= size + self.spacing
+        rects["label"] = QRect(x, rect.top(), max(0, right - x), rect.height())
+        return rects
+
+    def hitTest(self, option: QStyleOptionViewItem, index: QModelIndex, pos) -> str | None:
+        for name, rect in self.buttonRects(option.rect, index.model().isSubtask(index)).items():
+            if name != "label" and rect.contains(pos):
+                return name
+        return None
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), self.rowHeight)
+
+    # --- Painting ---
+
+    @timed("TaskDelegate.paint")
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        model = index.model()
+        isSubtask = model.isSubtask(index)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        rects = self.buttonRects(option.rect, isSubtask)
+        view = option.widget
+        cursor = view.viewport().mapFromGlobal(QCursor.pos()) if hovered and view else None
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.theme.color("selection"))
+            painter.drawRoundedRect(option.rect.adjusted(2, 2, -2, -2), 10, 10)
+
+        if not isSubtask:
+            expanded = view.isExpanded(index) if view else False
+            self.paintButton(painter, rects["dropdown"], "collapse" if expanded else "expand",
+                             cursor is not None and rects["dropdown"].contains(cursor))
+
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        self.paintCheckbox(painter, rects["checkbox"], checked,
+                           cursor is not None and rects["checkbox"].contains(cursor))
+
+        # Hover buttons fade in and out, driven by the view
+        opacity = self.fades.value((view, index.internalPointer())) if view else float(hovered)
+        labelRect = rects["label"] if opacity > 0 else QRect(rects["label"].topLeft(),
+                                                              option.rect.bottomRight())
+        painter.setPen(self.theme.color("text"))
+        painter.setFont(option.font)
+        text = option.fontMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, labelRect.width())
+        painter.drawText(labelRect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+
+        if opacity > 0:
+            painter.setOpacity(opacity)
+            for name in ("rename", "add", "delete"):
+                if name in rects:
+                    self.paintButton(painter, rects[name], name, cursor is not None and rects[name].contains(cursor))
+        painter.restore()
+
+    def paintButton(self, painter: QPainter, rect: QRect, name: str, hovered: bool) -> None:
+        if hovered:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.theme.color("deleteHover" if name == "delete" else "hover"))
+            painter.drawRoundedRect(rect, 10, 10)
+        painter.drawPixmap(rect.adjusted(8, 8, -8, -8), self.pixmaps[name])
+
+    def paintCheckbox(self, painter: QPainter, rect: QRect, checked: bool, hovered: bool) -> None:
+        accent = self.theme.color("accent")
+        painter.setPen(QPen(accent if checked or hovered else self.theme.color("checkboxBorder"), 2))
+        painter.setBrush(accent if checked else Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 3, 3)
+        if checked:
+            path = QPainterPath()
+            path.moveTo(QPointF(rect.left() + 5, rect.center().y() + 1))
+            path.lineTo(QPointF(rect.left() + 8.5, rect.bottom() - 5))
+            path.lineTo(QPointF(rect.right() - 4, rect.top() + 6))
+            painter.setPen(QPen(self.theme.color("text"), 2))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawPath(path)
+
+    def updateTheme(self, name: str | None = None) -> None:
+        # Glyphs are rendered once per theme, painting a row only blits them
+        color = self.theme.value("icon")
+        self.pixmaps = {name: cachedPixmap(glyph, color) for name, glyph in self.glyphs.items()}
+        view = self.parent()
+        if isinstance(view, QAbstractItemView):
+            view.viewport().update()
+
+    # --- Interaction ---
+
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() not in (QEvent.Type.MouseButtonRelease, QEvent.Type.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        hit = self.hitTest(option, index, event.pos())
+        if hit is None:
+            return False
+        if event.type() == QEvent.Type.MouseButtonDblClick:
+            return True
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        if hit == "checkbox":
+            checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+            model.setData(index, Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked,
+                          Qt.ItemDataRole.CheckStateRole)
+        elif hit == "dropdown":
+            self.toggleExpandRequested.emit(index)
+        elif hit == "rename" and hovered:
+            self.renameRequested.emit(index)
+        elif hit == "add" and hovered:
+            self.addSubtaskRequested.emit(index)
+        elif hit == "delete" and hovered:
+            self.deleteRequested.emit(index)
+        return True
+
+    def createEditor(self, parent: QWidget, option: QStyleOptionViewItem, index: QModelIndex) -> QWidget:
+        editor = QLineEdit(parent)
+        editor.setObjectName("TaskEdit")
+        return editor
+
+    def setEditorData(self, editor: QLineEdit, index: QModelIndex) -> None:
+        editor.setText(index.data(Qt.ItemDataRole.EditRole))
+        editor.selectAll()
+
+    def setModelData(self, editor: QLineEdit, model, index: QModelIndex) -> None:
+        model.setData(index, editor.text(), Qt.ItemDataRole.EditRole)
+
+    def updateEditorGeometry(self, editor: QWidget, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        rect = self.buttonRects(option.rect, index.model().isSubtask(index))["label"]
+        editor.setGeometry(rect.adjusted(0, 8, 0, -8))
+
+
+class TaskView(QTreeView):
+    """
+    Tree view showing tasks and their subtasks through a TaskDelegate.
+    Only the visible rows are laid out and painted, subtask rows are fetched on
+    first expand and released once their task stayed collapsed for releaseDelay.
+
+    Several tasks are selected with shift/ctrl clicks or Ctrl+A, Delete removes
+    them and Ctrl+Space toggles them in one batch.
+    """
+    releaseDelay = 60.0
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setObjectName("TaskView")
+        self.setHeaderHidden(True)
+        self.setRootIsDecorated(False)
+        self.setIndentation(44)
+        self.setUniformRowHeights(True)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover, True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.EditKeyPressed)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setExpandsOnDoubleClick(False)
+        self.setAnimated(not FadeDriver.reducedMotion)
+
+        self.hoveredTask = None
+        self.fades = fadeDriver()
+        self.fades.updated.connect(self.updateFades)
+
+        # Collapsed tasks with exposed subtask rows, and when they were collapsed
+        self.collapsedTasks: dict[Task, float] = {}
+        self.releaseTimer = QTimer(self)
+        self.releaseTimer.setSingleShot(True)
+        self.releaseTimer.timeout.connect(self.releaseCollapsed)
+        self.collapsed.connect(self.onCollapsed)
+        self.expanded.connect(self.onExpanded)
+
+        self.delegate = TaskDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.delegate.addSubtaskRequested.connect(self.addSubtask)
+        self.delegate.deleteRequested.connect(self.deleteTask)
+        self.delegate.renameRequested.connect(self.renameTask)
+        self.delegate.toggleExpandRequested.connect(self.toggleSubtaskVisibility)
+
+    def setModel(self, model) -> None:
+        super().setModel(model)
+        model.views.add(self)
+
+    def addSubtask(self, index: QModelIndex) -> None:
+        self.model().addSubtask(index)
+        self.expand(index)
+
+    def expandTask(self, index: QModelIndex) -> None:
+        """
+        Expand a task, its subtask rows are fetched while it is still collapsed
+        so the view only lays out the new rows.
+        """
+        self.model().fetchChildren(index)
+        self.expand(index)
+
+    def deleteTask(self, index: QModelIndex) -> None:
+        self.model().removeTask(index)
+
+    def selectedTasks(self) -> list[QModelIndex]:
+        return self.selectionModel().selectedIndexes()
+
+    def selectAll(self) -> None:
+        # Rows not fetched yet can't be selected
+        self.model().fetchAll()
+        super().selectAll()
+
+    def deleteSelection(self) -> None:
+        self.model().removeTasks(self.selectedTasks())
+
+    def setSelectionDone(self, done: bool) -> None:
+        self.model().setCheckedMany(self.selectedTasks(), done)
+
+    def toggleSelection(self) -> None:
+        """
+        Mark the selected tasks done, or undone when they all are done already.
+        """
+        selected = self.selectedTasks()
+        self.model().setCheckedMany(selected, not all(index.internalPointer().done for index in selected))
+
+    def drawBranches(self, painter: QPainter, rect: QRect, index: QModelIndex) -> None:
+        # The delegate paints its own dropdown button
+        pass
+
+    def keyPressEvent(self, event) -> None:
+        # Alt+Up/Down moves the current task among its siblings
+        index = self.currentIndex()
+        if event.modifiers() == Qt.KeyboardModifier.AltModifier and index.isValid() \
+                and event.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            offset = -1 if event.key() == Qt.Key.Key_Up else 1
+            self.model().moveTask(index, index.row() + offset)
+            return
+        if event.key() == Qt.Key.Key_Delete and self.selectionModel().hasSelection():
+            self.deleteSelection()
+            return
+        if event.key() == Qt.Key.Key_Space and event.modifiers() == Qt.KeyboardModifier.ControlModifier \
+                and self.selectionModel().hasSelection():
+            self.toggleSelection()
+            return
+        if index.isValid() and event.key() in (Qt.Key.Key_Right, Qt.Key.Key_Plus) and not self.isExpanded(index):
+            self.model().fetchChildren(index)
+        super().keyPressEvent(event)
+
+    def leaveEvent(self, event) -> None:
+        super().leaveEvent(event)
+        self.setHoveredTask(None)
+
+    def mouseMoveEvent(self, event) -> None:
+        super().mouseMoveEvent(event)
+        index = self.indexAt(event.pos())
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
+        self.setHoveredTask(index.internalPointer() if index.isValid() else None)
+
+    def renameTask(self, index: QModelIndex) -> None:
+        """
+        Show inline rename field.
+        """
+        self.edit(index)
+
+    def setHoveredTask(self, task: Task | None) -> None:
+        """
+        Fade the hover buttons out of the previous row and into the new one.
+        """
+        if task is self.hoveredTask:
+            return
+        if self.hoveredTask is not None:
+            self.fades.fadeTo((self, self.hoveredTask), 0.0)
+        self.hoveredTask = task
+        if task is not None:
+            self.fades.fadeTo((self, task), 1.0)
+
+    def updateFades(self, keys: list) -> None:
+        """
+        Repaint the rows whose fade progressed, fades of rows out of sight are finished.
+        """
+        model = self.model()
+        if model is None:
+            return
+        viewport = self.viewport()
+        area = viewport.rect()
+        for key in keys:
+            if key[0] is not self:
+                continue
+            task = key[1]
+            rect = self.visualRect(model.indexOf(task)) if model.document.get(task.id) is task else QRect()
+            if rect.intersects(area):
+                viewport.update(rect)
+            else:
+                self.fades.finish(key)
+
+    def toggleSubtaskVisibility(self, index: QModelIndex) -> None:
+        """
+        Expand/collapse subtasks
+        """
+        if self.isExpanded(index):
+            self.collapse(index)
+        else:
+            self.expandTask(index)
+
+    def onCollapsed(self, index: QModelIndex) -> None:
+        self.collapsedTasks[index.internalPointer()] = monotonic()
+        if not self.releaseTimer.isActive():
+            self.releaseTimer.start(int(self.releaseDelay * 1000))
+
+    def onExpanded(self, index: QModelIndex) -> None:
+        self.collapsedTasks.pop(index.internalPointer(), None)
+
+    def releaseCollapsed(self) -> None:
+        """
+        Release the subtask rows of the tasks collapsed for releaseDelay, all at once
+        so the view relayouts a single time.
+        """
+        model = self.model()
+        now = monotonic()
+        for task, collapsedAt in list(self.collapsedTasks.items()):
+            if now - collapsedAt < self.releaseDelay:
+                continue
+            del self.collapsedTasks[task]
+            if model.document.get(task.id) is not task:
+                continue
+            index = model.indexOf(task)
+            # Another view of the same list may still show the subtasks
+            if not any(view.isExpanded(index) for view in model.views if view is not self):
+                model.releaseChildren(index)
+        if self.collapsedTasks:
+            wait = min(self.collapsedTasks.values()) + self.releaseDelay - now
+            self.releaseTimer.start(max(0, int(wait * 1000)))
@@ -1,37 +1,114 @@
 """
     The task list module used to manage task group.
 """
-import json
-import os
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import QModelIndex, QPoint, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (
+    QAbstractItemView,
     QHBoxLayout, 
-    QGridLayout,
-    QLabel,
-    QScrollArea,
     QPushButton,
     QFrame, 
     QProgressBar,
     QInputDialog, 
     QMessageBox,
     QMenu,
+    QShortcut,
     QVBoxLayout, 
     QWidget, 
 )
-from qtawesome import icon
+from .autosave import SaveScheduler
 from .core import listTaskListName, removeTaskList, renameTaskList
-from .task import SubTask, Task
-from customWidgets import SectionTitle
+from .documentRegistry import getDocumentRegistry
+from .settings import getSettings
+from .storage import getStorage
+from .task import ProgressStats, Task
+from .taskDocument import TaskDocument
+from .taskListsModel import TaskListsModel
+from .taskListsView import TaskListsView
+from .taskView import TaskView
+from .summaryIndex import getSummaryIndex
+from .undoStack import ENTRY_SIZE, Command, RemoveCommand, UndoStack, entriesSize
+from customWidgets import SectionTitle, cachedIcon
+from customWidgets.instrumentation import timed
+
+
+class MoveCommand(RemoveCommand):
+    """
+    Tasks moved to the end of another list: removed from the list of the model
+    the command is replayed on, appended to the other one.
+    """
+    text = "Move to list"
+
+    def __init__(self, entries: list, name: str, movedIds: list[int]) -> None:
+        super().__init__(entries)
+        self.name = name
+        # Ids of the tasks in the other list, they differ when the ones moved were taken
+        self.movedIds = movedIds
+
+    def redo(self, model) -> None:
+        registry = getDocumentRegistry()
+        target = registry.acquire(self.name, model)
+        try:
+            if not target.loadNow():
+                # The tasks stay in this list rather than being lost
+                return
+            with target.model.undoStack.paused():
+                self.movedIds = target.model.appendTasks([data for _, _, data in self.entries])
+        finally:
+            registry.release(target, id(model))
+        super().redo(model)
+
+    def undo(self, model) -> None:
+        registry = getDocumentRegistry()
+        target = registry.acquire(self.name, model)
+        try:
+            # An unreadable list keeps its copy of the tasks
+            if target.loadNow():
+                with target.model.undoStack.paused():
+                    target.model.removeIds(self.movedIds)
+        finally:
+            registry.release(target, id(model))
+        super().undo(model)
+
+
+class RemoveListCommand(Command):
+    """
+    A task list deleted from the explorer, with its serialized content.
+    """
+    text = "Delete list"
+
+    def __init__(self, name: str, data: dict) -> None:
+        super().__init__()
+        self.name = name
+        self.data = data
+
+    @property
+    def size(self) -> int:
+        return ENTRY_SIZE + entriesSize([(None, 0, task) for task in self.data.get("tasks", ())])
+
+    def redo(self, explorer) -> None:
+        explorer.deleteList(self.name)
+
+    def undo(self, explorer) -> None:
+        explorer.restoreList(self.name, self.data)
+
 
 class TaskList(QFrame):
+    """
+    A view of a task list. Lists are shared through the document registry: tabs
+    showing the same list use one document, one model and one save scheduler.
+    """
+    loaded = pyqtSignal()
 
     def __init__(self, name: str = "Untitled"):
         super().__init__()
-        self.name = name
-        self.tasks : list[Task] = []
+        self.openDocument = getDocumentRegistry().acquire(name, self)
+        # Task shown once the running load ends, with its scroll hint
+        self.pendingTask: tuple | None = None
+        self.destroyed.connect(lambda obj=None, openDocument=self.openDocument, viewId=id(self):
+                               getDocumentRegistry().release(openDocument, viewId))
 
         self.setObjectName("TaskList")
-        self.setStyleSheet(self.applyStyleSheet())
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignmentFlag.AlignTop)
@@ -49,7 +126,7 @@ class TaskList(QFrame):
         self.progress.setTextVisible(False)
 
         self.addTaskBtn = QPushButton("")
-        self.addTaskBtn.setIcon(icon("fa5s.plus", color="white"))
+        self.addTaskBtn.setIcon(cachedIcon("fa5s.plus"))
         self.addTaskBtn.setToolTip("Add task")
         self.addTaskBtn.setFixedSize(32, 32)
 
@@ -61,246 +138,315 @@ class TaskList(QFrame):
         layout.addLayout(toolsLayout)
 
         # Tasks area
-        self.taskLayout = QVBoxLayout()
-        self.taskLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        layout.addLayout(self.taskLayout)
+        self.model = self.openDocument.model
+        self.view = TaskView()
+        self.view.setModel(self.model)
+        self.view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        layout.addWidget(self.view)
 
         self.addTaskBtn.clicked.connect(self.addTask)
+        self.view.customContextMenuRequested.connect(self.showSelectionMenu)
+        QShortcut(QKeySequence.StandardKey.Undo, self, self.undo, context=Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        QShortcut(QKeySequence.StandardKey.Redo, self, self.redo, context=Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        self.model.tasksChanged.connect(self.updateProgress)
+        self.openDocument.loaded.connect(self.onLoaded)
+        self.openDocument.documentChanged.connect(self.onDocumentChanged)
+        self.setLoading(self.loadJob is not None)
+        self.onDocumentChanged()
+
+    @property
+    def document(self) -> TaskDocument:
+        return self.openDocument.document
+
+    @property
+    def loadJob(self):
+        return self.openDocument.loadJob
+
+    @property
+    def saveScheduler(self) -> SaveScheduler:
+        return self.openDocument.saveScheduler
+
+    @property
+    def tasks(self) -> list[Task]:
+        return self.model.tasks
+
+    @property
+    def editable(self) -> bool:
+        """
+        Whether the list is loaded, edits of an unreadable list would be saved over it.
+        """
+        return self.loadJob is None and self.openDocument.loadError is None
 
     def addTask(self):
-        task = Task("New Task", self)
-        self.taskLayout.addWidget(task)
-        self.tasks.append(task)
-        self.updateProgress()
+        index = self.model.addTask("New Task")
+        # A task past the rows fetched is shown when the view scrolls to the end
+        if index.isValid():
+            self.view.scrollTo(index)
 
-    def applyStyleSheet(self) -> str:
-        return """
-        #TaskList QLabel {
-            color: white;
-        }
-
-        #TaskList QPushButton:hover {
-            background-color: #4c566a;
-            border-radius: 10px;
-            padding: 5px;
-        }
-
-        #TaskList QProgressBar {
-            background-color: #2e3b5b;
-            border-radius: 10px;
-        }
-
-        #TaskList QProgressBar::chunk {
-            background-color: green;
-            border-radius: 10px;
-        }
+    def undo(self) -> None:
+        """
+        Undo the last edit of the list, made in this tab or another one showing it.
         """
+        if self.editable:
+            self.model.undoStack.undo()
 
+    def redo(self) -> None:
+        if self.editable:
+            self.model.undoStack.redo()
+
+    def showSelectionMenu(self, pos: QPoint) -> None:
+        """
+        Batch actions on the selected tasks.
+        """
+        selected = self.view.selectedTasks()
+        menu = QMenu(self)
+        done_action = undone_action = delete_action = None
+        if selected:
+            count = len(self.model.itemsOf(selected))
+            plural = "s" if count > 1 else ""
+            done_action = menu.addAction(f"Mark {count} task{plural} done")
+            undone_action = menu.addAction(f"Mark {count} task{plural} undone")
+            moveMenu = menu.addMenu("Move to")
+            for name in sorted(listTaskListName()):
+                if name != self.name:
+                    moveMenu.addAction(name).setData(name)
+            moveMenu.setEnabled(not moveMenu.isEmpty())
+            delete_action = menu.addAction(f"Delete {count} task{plural}")
+            menu.addSeparator()
+        select_all_action = menu.addAction("Select all")
+        undoStack = self.model.undoStack
+        undo_action = redo_action = None
+        if undoStack.done or undoStack.undone:
+            menu.addSeparator()
+            undo_action = menu.addAction(f"Undo {undoStack.done[-1].text.lower()}" if undoStack.done else "Undo")
+            undo_action.setEnabled(bool(undoStack.done))
+            redo_action = menu.addAction(f"Redo {undoStack.undone[-1].text.lower()}" if undoStack.undone else "Redo")
+            redo_action.setEnabled(bool(undoStack.undone))
+        action = menu.exec_(self.view.viewport().mapToGlobal(pos))
+        if action is None:
+            return
+        if action == undo_action:
+            self.undo()
+        elif action == redo_action:
+            self.redo()
+        elif action == done_action or action == undone_action:
+            self.view.setSelectionDone(action == done_action)
+        elif action == delete_action:
+            self.view.deleteSelection()
+        elif action == select_all_action:
+            self.view.selectAll()
+        elif action.data() is not None:
+            self.moveSelection(action.data())
+
+    @timed("TaskList.moveSelection")
+    def moveSelection(self, name: str) -> None:
+        """
+        Move the selected tasks at the end of another list, one change on each list.
+        Selected subtasks become tasks of their own. Undoing it in this list puts
+        them back in place and removes them from the other one.
+        """
+        selected = self.view.selectedTasks()
+        items = self.model.itemsOf(selected)
+        if name == self.name or not items:
+            return
+        items.sort(key=lambda item: (item.parent.row, item.row) if item.parent is not None else (item.row, -1))
+        entries = self.model.entriesOf(items)
+        registry = getDocumentRegistry()
+        target = registry.acquire(name, self)
+        try:
+            # The tasks are appended to the stored ones
+            if not target.loadNow():
+                QMessageBox.warning(self, "Move", f"Task list '{name}' can't be read: {target.loadError}")
+                return
+            with target.model.undoStack.paused():
+                movedIds = target.model.appendTasks([item.toDict() for item in items])
+        finally:
+            registry.release(target, id(self))
+        undoStack = self.model.undoStack
+        with undoStack.paused():
+            self.model.removeTasks(selected)
+        undoStack.push(MoveCommand(entries, name, movedIds))
+
+    @timed("TaskList.loadFromFile")
     def loadFromFile(self, name: str):
         """
-        Load a task list from a JSON file and reconstruct the task list.
+        Load a task list in the background, the tab stays responsive while the file
+        is parsed and `loaded` is emitted once the tasks are shown. A list already
+        open in another view is not parsed again.
 
         Args:
-            name (str): Path to the JSON file.
+            name (str): Name of the task list.
         """
-        if not os.path.exists(f"data\\taskLists\\{name}.json"):
-            print(f"File \"data\\taskLists\\{name}\" does not exist.")
+        if self.openDocument.isLoaded:
+            # Emitted from the event loop, like after a load
+            QTimer.singleShot(0, self.loaded.emit)
             return
+        self.setLoading(True)
+        self.openDocument.load()
 
-        with open(f"data\\taskLists\\{name}.json", "r") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse JSON: {e}")
-                return
-
-        # Clear current tasks
-        for task in self.tasks:
-            task.setParent(None)
-            task.deleteLater()
-        self.tasks.clear()
+    def onLoaded(self) -> None:
+        self.setLoading(False)
+        if self.pendingTask is not None:
+            self.showTask(*self.pendingTask)
+        self.loaded.emit()
 
-        # Restore title
-        self.name = data.get("name", "Unnamed List")
-        self.nameLabel.label.setText(self.name)
-
-        for task_data in data.get("tasks", []):
-            task_name = task_data.get("name", "Unnamed Task")
-            task = Task(task_name, self)
-            task.checkbox.setChecked(task_data.get("done", False))
-
-            # Add subtasks if any
-            for sub_data in task_data.get("subtasks", []):
-                sub_name = sub_data.get("name", "Unnamed Subtask")
-                sub = SubTask(sub_name, task)
-                sub.checkbox.setChecked(sub_data.get("done", False))
-                task.subtask_layout.addWidget(sub)
-                task.subtasks.append(sub)
-
-            self.taskLayout.addWidget(task)
-            self.tasks.append(task)
+    def showTask(self, taskId: int, hint=QAbstractItemView.ScrollHint.PositionAtTop) -> None:
+        """
+        Scroll to a task and make it current, once the list is loaded.
+        """
+        if self.loadJob is not None:
+            self.pendingTask = (taskId, hint)
+            return
+        self.pendingTask = None
+        task = self.document.get(taskId)
+        if task is None:
+            return
+        model = self.model
+        top = task.parent or task
+        # Rows are fetched in batches, expose the ones up to the task
+        while model.fetched <= top.row and model.canFetchMore(QModelIndex()):
+            model.fetchMore(QModelIndex())
+        if task is not top:
+            self.view.expandTask(model.indexOf(top))
+        index = model.indexOf(task)
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index, hint)
+
+    def setLoading(self, loading: bool) -> None:
+        """
+        Show a busy progress bar and block edits while a load is running,
+        or for good when the stored list couldn't be read.
+        """
+        error = self.openDocument.loadError
+        editable = not loading and error is None
+        self.progress.setRange(0, 0 if loading else 100)
+        self.addTaskBtn.setEnabled(editable)
+        self.view.setEnabled(editable)
+        self.view.setToolTip(f"This list can't be read: {error}" if error is not None and not loading else "")
+
+    @property
+    def name(self) -> str:
+        return self.document.name
+
+    def setDocument(self, document: TaskDocument) -> None:
+        """
+        Show another document in this list and the views sharing it.
+        """
+        self.openDocument.setDocument(document)
 
+    def onDocumentChanged(self) -> None:
+        self.nameLabel.label.setText(self.document.name)
         self.updateProgress()
 
-    def removeTask(self, task):
-        if task in self.tasks:
-            self.tasks.remove(task)
-        self.updateProgress()
+    @property
+    def stats(self) -> ProgressStats:
+        """
+        Done/total counters for tasks and subtasks, kept up to date by the model.
+        """
+        return self.model.stats
 
+    @timed("TaskList.updateProgress")
     def updateProgress(self):
-        if not self.tasks:
-            self.progress.setValue(0)
-            return
-        done_count = sum(1 for t in self.tasks if t.checkbox.isChecked())
-        percent = int((done_count / len(self.tasks)) * 100)
-        self.progress.setValue(percent)
-        self.saveToFile()
+        self.progress.setValue(self.stats.percent)
 
+    @timed("TaskList.saveToFile")
     def saveToFile(self):
-        data = {
-            "name": self.name,
-            "tasks": [t.toDict() for t in self.tasks]
-        }
-        with open(f"data\\taskLists\\{self.name}.json", "w") as f:
-            json.dump(data, f, indent=4)
-
-class TaskListPreview(QWidget):
-    openRequested = pyqtSignal(str)
-    renameRequested = pyqtSignal(str)
-    deleteRequested = pyqtSignal(str)
-
-    def __init__(self, name: str):
-        super().__init__()
-        self.name = name
-        self.setObjectName("TaskListPreview")
-        self.setStyleSheet(self.applyStyleSheet())
-
-        mainLayout = QVBoxLayout(self)
-        mainLayout.setContentsMargins(10, 5, 10, 5)
-
-        self.icon = QLabel()
-        self.icon.setPixmap(icon("fa5s.tasks", color="white").pixmap(32, 32))
-
-        self.label = QLabel(name)
-        self.optionsBtn = QPushButton("")
-        self.optionsBtn.setIcon(icon("fa5s.ellipsis-v", color="white"))
-        self.optionsBtn.setFixedSize(32, 32)
-        self.optionsBtn.setVisible(False)
-
-        mainLayout.addWidget(self.icon, alignment=Qt.AlignmentFlag.AlignHCenter)
-        bottomLayout = QHBoxLayout()
-        bottomLayout.addWidget(self.label, alignment=Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft)
-        bottomLayout.addWidget(self.optionsBtn, alignment=Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignRight)
-        
-        mainLayout.addLayout(bottomLayout)
-
-        self.optionsBtn.clicked.connect(self.showOptions)
-        self.setFixedSize(125, 95)
-
-    def applyStyleSheet(self) -> str:
-        return """
-        #TaskListPreview QLabel {
-            color: white;
-        }
-
-        #TaskListPreview QPushButton:hover {
-            background-color: #4c566a;
-            border-radius: 10px;
-            padding: 5px;
-        }
         """
-
-    def showOptions(self):
-        menu = QMenu(self)
-        rename_action = menu.addAction("Rename")
-        delete_action = menu.addAction("Delete")
-        action = menu.exec_(self.optionsBtn.mapToGlobal(self.optionsBtn.rect().bottomRight()))
-        if action == rename_action:
-            self.renameRequested.emit(self.name)
-        elif action == delete_action:
-            self.deleteRequested.emit(self.name)
-
-    def enterEvent(self, event):
-        self.optionsBtn.setVisible(True)
-
-    def leaveEvent(self, event):
-        self.optionsBtn.setVisible(False)
-
-    def mouseDoubleClickEvent(self, event):
-        self.openRequested.emit(self.name)
+        Write pending changes now, used when the list is closed.
+        """
+        self.openDocument.flush()
 
 class TaskListExplorer(QWidget):
+    """
+    Previews of every stored task list in a virtualized grid. The Tasker keeps a
+    single explorer alive, the summary index watches the storage and its signals
+    add, rename, update or remove rows of the model one at a time.
+    """
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.tasker = parent 
 
         self.setObjectName("TaskListExplorer")
-        self.setStyleSheet(self.applyStyleSheet())
 
-        self.maxCol = 10
-        self.currentIndex = 0
+        self.summaryIndex = getSummaryIndex()
+        # Deleted lists, with their content
+        self.undoStack = UndoStack(self, getSettings().value("history.memoryBudget"))
         layout = QVBoxLayout(self)
         title = SectionTitle("Task Lists")
         layout.addWidget(title)
         layout.setSpacing(0)
-        self.scrollArea = QScrollArea()
-        self.scrollArea.setWidgetResizable(True)
 
-        self.container = QWidget()
-        self.listLayout = QGridLayout(self.container)
-        self.scrollArea.setWidget(self.container)
-
-        layout.addWidget(self.scrollArea)
+        self.model = TaskListsModel(self.summaryIndex, self)
+        self.view = TaskListsView()
+        self.view.setModel(self.model)
+        layout.addWidget(self.view)
+
+        self.view.openRequested.connect(self.openList)
+        self.view.optionsRequested.connect(self.showOptions)
+        self.view.renameRequested.connect(self.renameList)
+        self.view.deleteRequested.connect(self.removeList)
+        self.summaryIndex.listsFound.connect(self.model.addNames)
+        self.summaryIndex.summaryChanged.connect(self.model.updateName)
+        self.summaryIndex.summaryRemoved.connect(self.model.removeName)
+        self.summaryIndex.summaryRenamed.connect(self.model.renameName)
+        QShortcut(QKeySequence.StandardKey.Undo, self, self.undoStack.undo,
+                  context=Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        QShortcut(QKeySequence.StandardKey.Redo, self, self.undoStack.redo,
+                  context=Qt.ShortcutContext.WidgetWithChildrenShortcut)
         self.showTaskLists()
-
-    def addTaskListPreview(self, name: str):
-        preview = TaskListPreview(name)
-        preview.openRequested.connect(self.openList)
-        preview.renameRequested.connect(self.renameList)
-        preview.deleteRequested.connect(self.removeList)
-        row = self.currentIndex // self.maxCol
-        col = self.currentIndex % self.maxCol
-        self.listLayout.addWidget(preview, row, col)
-        self.currentIndex += 1
-
-    def applyStyleSheet(self) -> str:
-        return """
-        #TaskListExplorer QLabel {
-            color: white;
-        }
-        """
+        self.summaryIndex.watch()
 
     def openList(self, name: str):
-        if self.tasker is None:
-            return
-        taskLists = TaskList()
-        taskLists.loadFromFile(name)
-        self.tasker.addTaskList(taskLists, name)
+        if self.tasker is not None:
+            self.tasker.openTaskList(name)
+
+    def showOptions(self, name: str, pos: QPoint) -> None:
+        menu = QMenu(self)
+        rename_action = menu.addAction("Rename")
+        delete_action = menu.addAction("Delete")
+        action = menu.exec_(pos)
+        if action == rename_action:
+            self.renameList(name)
+        elif action == delete_action:
+            self.removeList(name)
 
     def renameList(self, old_name: str):
         new_name, ok = QInputDialog.getText(self, "Rename Task List", "New name:", text=old_name)
-        if ok and new_name.strip():
-            # Remplace le widget
-            for i in range(self.listLayout.count()):
-                item = self.listLayout.itemAt(i).widget()
-                if item.name == old_name:
-                    item.name = new_name
-                    item.label.setText(new_name)
-                    renameTaskList(old_name, new_name)
-                    break
+        if ok and new_name.strip() and old_name in self.model and new_name not in self.model:
+            getDocumentRegistry().rename(old_name, new_name)
+            renameTaskList(old_name, new_name)
+            # The row follows through summaryRenamed
+            self.summaryIndex.rename(old_name, new_name)
 
     def removeList(self, name: str):
         confirm = QMessageBox.question(self, "Delete", f"Delete task list '{name}'?")
-        if confirm == QMessageBox.Yes:
-            for i in range(self.listLayout.count()):
-                item = self.listLayout.itemAt(i).widget()
-                if item.name == name:
-                    item.setParent(None)
-                    item.deleteLater()
-                    removeTaskList(name)
-                    break
+        if confirm == QMessageBox.Yes and name in self.model:
+            data = getStorage().load(name)
+            self.deleteList(name)
+            if data is not None:
+                self.undoStack.push(RemoveListCommand(name, data))
+
+    def deleteList(self, name: str) -> None:
+        removeTaskList(name)
+        self.summaryIndex.remove(name)
+        self.model.removeName(name)
+
+    def restoreList(self, name: str, data: dict) -> None:
+        """
+        Store a deleted list again, the row follows through summaryChanged.
+        """
+        document = TaskDocument.fromDict(data)
+        document.name = name
+        storage = getStorage()
+        storage.write(storage.fullSnapshot(document))
+        self.summaryIndex.record(name, document.stats.toDict())
 
+    @timed("TaskListExplorer.showTaskLists")
     def showTaskLists(self) -> None:
-        for file in listTaskListName():
-            self.addTaskListPreview(file)
\ No newline at end of file
+        """
+        Show the lists known by the summary index right away, the index then checks
+        the storage in the background and sends the differences.
+        """
+        self.model.setNames(self.summaryIndex.names())
+        self.summaryIndex.refresh()
\ No newline at end of file
@@ -0,0 +1,357 @@
+"""
+    Theme module: the application stylesheet, compiled once per theme and applied
+    on the QApplication so widgets never parse a stylesheet of their own.
+"""
+from string import Template
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication
+
+THEMES: dict[str, dict[str, str]] = {
+    "dark_blue": {
+        "window": "#273044",
+        "surface": "#2a3247",
+        "sidebar": "#181f30",
+        "text": "white",
+        "mutedText": "#a3b1cc",
+        "icon": "white",
+        "hover": "#4c566a",
+        "accent": "#3f51b5",
+        "accentHover": "#5c6bc0",
+        "primary": "#5e81ac",
+        "primaryHover": "#6a9ac9",
+        "danger": "#bf616a",
+        "deleteHover": "red",
+        "checkboxBorder": "#9e9e9e",
+        "progressTrack": "#2e3b5b",
+        "progressChunk": "green",
+        "tabHover": "#344058",
+        "selection": "#34426a",
+    },
+    "midnight": {
+        "window": "#1b1e27",
+        "surface": "#232733",
+        "sidebar": "#111319",
+        "text": "#e5e9f0",
+        "mutedText": "#8f96a8",
+        "icon": "white",
+        "hover": "#3b4252",
+        "accent": "#7e57c2",
+        "accentHover": "#9575cd",
+        "primary": "#5e60ce",
+        "primaryHover": "#7400b8",
+        "danger": "#bf616a",
+        "deleteHover": "#d32f2f",
+        "checkboxBorder": "#6b7280",
+        "progressTrack": "#2a2e3b",
+        "progressChunk": "#43a047",
+        "tabHover": "#2c3140",
+        "selection": "#342c4d",
+    },
+}
+DEFAULT_THEME = "dark_blue"
+
+STYLESHEET = Template("""
+    #MainWindowContainer {
+        background-color: $window;
+    }
+
+    #BtnFrame {
+        background-color: $surface;
+        border-radius: 20px;
+    }
+
+    #Sidebar {
+        background-color: $sidebar;
+    }
+
+    #SidebarButton {
+        background-color: transparent;
+        border: none;
+        border-radius: 5px;
+    }
+
+    #SidebarButton:hover {
+        background-color: $hover;
+    }
+
+    #AddItemButton {
+        background-color: $primary;
+        color: $text;
+        font-size: 24px;
+        font-weight: bold;
+        border: none;
+        border-radius: 25px;
+    }
+
+    #AddItemButton:hover {
+        background-color: $primaryHover;
+    }
+
+    /* --- CustomTitleBar --- */
+    #CustomTitlebar {
+        background-color: $sidebar;
+    }
+
+    #CustomTabWidget QTabBar::close-button {
+        border-radius: 6px;
+        image : url("ressources/images/cross.png");
+        padding: 4px;
+        subcontrol-position: right;
+        width: 32px;
+        height: 32px;
+    }
+
+    #CustomTabWidget QTabBar::close-button:hover {
+        background-color: $primaryHover;
+    }
+
+    #Icon, #Icon:hover {
+        background-color: $surface;
+        border-radius: 10px;
+        margin: 10px;
+    }
+
+    #MinButton, #MaxRestoreButton, #CloseButton {
+        background-color: transparent;
+        color: $text;
+        font-size: 16px;
+        border: none;
+        font-weight: bold;
+    }
+
+    #MinButton:hover, #MaxRestoreButton:hover {
+        background-color: $hover;
+    }
+
+    #CloseButton:hover {
+        background-color: $danger;
+    }
+
+    /* --- Task lists --- */
+    #TaskList QLabel, #TaskListExplorer QLabel {
+        color: $text;
+    }
+
+    #TaskList QPushButton:hover {
+        background-color: $hover;
+        border-radius: 10px;
+        padding: 5px;
+    }
+
+    #TaskList QProgressBar {
+        background-color: $progressTrack;
+        border-radius: 10px;
+    }
+
+    #TaskList QProgressBar::chunk {
+        background-color: $progressChunk;
+        border-radius: 10px;
+    }
+
+    #TaskList QLineEdit {
+        border: none;
+        color: $text;
+        background-color: transparent;
+    }
+
+    /* --- Search --- */
+    #SearchPanel QLabel {
+        color: $mutedText;
+    }
+
+    #SearchField {
+        background-color: $surface;
+        color: $text;
+        border-radius: 8px;
+        padding: 6px 10px;
+    }
+
+    #SearchResults {
+        color: $text;
+    }
+
+    #SearchResults::item {
+        padding: 6px;
+        border-radius: 6px;
+    }
+
+    #SearchResults::item:hover, #SearchResults::item:selected {
+        background-color: $hover;
+    }
+
+    /* Default style */
+    QWidget {
+        background-color: transparent;
+        border: none;
+    }
+
+    /* Menus and dialogs are top level windows, outside of the main window */
+    QMenu, QDialog {
+        background-color: $surface;
+        color: $text;
+    }
+
+    QMenu::item {
+        padding: 4px 16px;
+    }
+
+    QMenu::item:selected {
+        background-color: $hover;
+    }
+
+    QDialog QLabel {
+        color: $text;
+    }
+
+    QDialog QLineEdit {
+        background-color: $window;
+        color: $text;
+        border-radius: 4px;
+        padding: 4px;
+    }
+
+    QDialog QPushButton {
+        background-color: $hover;
+        color: $text;
+        border-radius: 4px;
+        padding: 4px 12px;
+    }
+
+    QScrollBar:vertical {
+        background: transparent;
+        width: 8px;
+        margin: 0px;
+        border-radius: 4px;
+    }
+
+    QScrollBar::handle:vertical {
+        background: $accent;
+        min-height: 30px;
+        border-radius: 4px;
+    }
+
+    QScrollBar::handle:vertical:hover {
+        background: $accentHover;
+    }
+
+    QScrollBar::add-line:vertical,
+    QScrollBar::sub-line:vertical {
+        height: 0px;
+    }
+
+    QScrollBar::add-page:vertical,
+    QScrollBar::sub-page:vertical {
+        background: none;
+    }
+
+    QScrollBar:horizontal {
+        background: transparent;
+        height: 8px;
+        margin: 0px;
+        border-radius: 4px;
+    }
+
+    QScrollBar::handle:horizontal {
+        background: $accent;
+        min-width: 30px;
+        border-radius: 4px;
+    }
+
+    QScrollBar::handle:horizontal:hover {
+        background: $accentHover;
+    }
+
+    QScrollBar::add-line:horizontal,
+    QScrollBar::sub-line:horizontal {
+        width: 0px;
+    }
+
+    QScrollBar::add-page:horizontal,
+    QScrollBar::sub-page:horizontal {
+        background: none;
+    }
+""")
+
+
+class ThemeEngine(QObject):
+    """
+    Owns the application stylesheet. Each theme is compiled once and cached,
+    switching themes is a single setStyleSheet on the QApplication.
+
+    Widgets painting themselves (delegates, the tab bar) read their colors with
+    color() and refresh on themeChanged.
+    """
+    themeChanged = pyqtSignal(str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.name = DEFAULT_THEME
+        self.stylesheets: dict[str, str] = {}
+        self.colors = self.paletteOf(DEFAULT_THEME)
+        from .settings import getSettings
+        getSettings().changed.connect(self.onSettingChanged)
+
+    def apply(self, name: str | None = None) -> None:
+        """
+        Apply a theme to the whole application, the one of the settings by default.
+        """
+        if name is None:
+            from .settings import getSettings
+            name = getSettings().value("apparence.theme")
+        if name not in THEMES:
+            print(f"Unknown theme {name}, using {DEFAULT_THEME}")
+            name = DEFAULT_THEME
+        self.name = name
+        self.colors = self.paletteOf(name)
+        QApplication.instance().setStyleSheet(self.compile(name))
+        self.themeChanged.emit(name)
+
+    def onSettingChanged(self, key: str, value) -> None:
+        if key == "apparence.theme" and value != self.name:
+            self.apply(value)
+
+    def color(self, token: str) -> QColor:
+        return self.colors[token]
+
+    def compile(self, name: str) -> str:
+        """
+        Stylesheet of a theme, built on first use.
+        """
+        stylesheet = self.stylesheets.get(name)
+        if stylesheet is None:
+            stylesheet = self.stylesheets[name] = STYLESHEET.substitute(THEMES[name])
+        return stylesheet
+
+    @staticmethod
+    def paletteOf(name: str) -> dict[str, QColor]:
+        return {token: QColor(value) for token, value in THEMES[name].items()}
+
+    def setTheme(self, name: str) -> None:
+        """
+        Switch theme at runtime and remember it in the settings.
+        """
+        if name not in THEMES or name == self.name:
+            return
+        from .settings import getSettings
+        self.apply(name)
+        getSettings().setValue("apparence.theme", name)
+
+    @property
+    def themes(self) -> list[str]:
+        return list(THEMES)
+
+    def value(self, token: str) -> str:
+        return THEMES[self.name][token]
+
+
+_themeEngine: ThemeEngine | None = None
+
+def getThemeEngine() -> ThemeEngine:
+    """
+    The application theme engine, created on first use.
+    """
+    global _themeEngine
+    if _themeEngine is None:
+        _themeEngine = ThemeEngine()
+    return _themeEngine
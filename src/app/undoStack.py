@@ -0,0 +1,253 @@
+"""
+    Undo stack module: edits recorded as small commands holding what they changed,
+    undone and redone on the model (or explorer) they were done on.
+"""
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+
+# Rough bytes of a recorded task or state, names are counted on top
+ENTRY_SIZE = 64
+
+
+def entriesSize(entries: list) -> int:
+    """
+    Estimated memory of serialized tasks: (parent id, row, Task.toDict()) entries.
+    """
+    size = 0
+    for _, _, data in entries:
+        size += ENTRY_SIZE + len(data["name"])
+        for sub in data.get("subtasks", ()):
+            size += ENTRY_SIZE + len(sub["name"])
+    return size
+
+
+class Command:
+    """
+    One undoable edit. Commands hold ids and the values they replaced, never
+    Task objects: undoing a deletion creates new ones.
+    """
+    text = ""
+
+    def __init__(self) -> None:
+        self.time = monotonic()
+
+    @property
+    def size(self) -> int:
+        """
+        Estimated memory held by the command, counted against the stack budget.
+        """
+        return ENTRY_SIZE
+
+    def merge(self, other: "Command") -> bool:
+        """
+        Absorb a command done right after this one, returns whether it did.
+        """
+        return False
+
+    def redo(self, target) -> None:
+        raise NotImplementedError
+
+    def undo(self, target) -> None:
+        raise NotImplementedError
+
+
+class InsertCommand(Command):
+    """
+    Tasks added to a list, as (parent id, row, Task.toDict()) entries, and the
+    done states of the tasks that got their first subtasks: a task left without
+    subtasks keeps the state they gave it, undo sets the previous one.
+    """
+    text = "Add"
+
+    def __init__(self, entries: list, parentStates: list[tuple[int, bool]] = ()) -> None:
+        super().__init__()
+        self.entries = entries
+        self.parentStates = list(parentStates)
+
+    @property
+    def size(self) -> int:
+        return entriesSize(self.entries) + 16 * len(self.parentStates)
+
+    def redo(self, model) -> None:
+        model.insertEntries(self.entries)
+
+    def undo(self, model) -> None:
+        model.removeIds([data["id"] for _, _, data in self.entries])
+        model.setIdStates(self.parentStates)
+
+
+class RemoveCommand(InsertCommand):
+    """
+    Tasks deleted from a list, with the rows they were at.
+    """
+    text = "Delete"
+
+    def redo(self, model) -> None:
+        InsertCommand.undo(self, model)
+
+    def undo(self, model) -> None:
+        InsertCommand.redo(self, model)
+
+
+class RenameCommand(Command):
+    text = "Rename"
+
+    def __init__(self, taskId: int, oldName: str, newName: str) -> None:
+        super().__init__()
+        self.taskId = taskId
+        self.oldName = oldName
+        self.newName = newName
+
+    @property
+    def size(self) -> int:
+        return ENTRY_SIZE + len(self.oldName) + len(self.newName)
+
+    def merge(self, other: Command) -> bool:
+        if not isinstance(other, RenameCommand) or other.taskId != self.taskId:
+            return False
+        self.newName = other.newName
+        return True
+
+    def redo(self, model) -> None:
+        model.renameId(self.taskId, self.newName)
+
+    def undo(self, model) -> None:
+        model.renameId(self.taskId, self.oldName)
+
+
+class ReorderCommand(Command):
+    text = "Move"
+
+    def __init__(self, taskId: int, oldRow: int, newRow: int) -> None:
+        super().__init__()
+        self.taskId = taskId
+        self.oldRow = oldRow
+        self.newRow = newRow
+
+    def merge(self, other: Command) -> bool:
+        # Alt+Up pressed several times moves one task several rows
+        if not isinstance(other, ReorderCommand) or other.taskId != self.taskId:
+            return False
+        self.newRow = other.newRow
+        return True
+
+    def redo(self, model) -> None:
+        model.moveId(self.taskId, self.newRow)
+
+    def undo(self, model) -> None:
+        model.moveId(self.taskId, self.oldRow)
+
+
+class ToggleCommand(Command):
+    """
+    Done states set, and the states they replaced. Toggling a task sets its
+    subtasks, their previous states are the ones restored.
+    """
+    text = "Check"
+
+    def __init__(self, before: list[tuple[int, bool]], after: list[tuple[int, bool]]) -> None:
+        super().__init__()
+        self.before = before
+        self.after = after
+
+    @property
+    def size(self) -> int:
+        return ENTRY_SIZE + 16 * (len(self.before) + len(self.after))
+
+    def merge(self, other: Command) -> bool:
+        if not isinstance(other, ToggleCommand):
+            return False
+        # Undone newest first, so the oldest states are the ones left
+        self.before = other.before + self.before
+        self.after = self.after + other.after
+        return True
+
+    def redo(self, model) -> None:
+        model.setIdStates(self.after)
+
+    def undo(self, model) -> None:
+        model.setIdStates(self.before)
+
+
+class UndoStack:
+    """
+    Commands done on a target, oldest first, and the undone ones. Commands
+    pushed within mergeWindow seconds of the previous one can merge into it, a
+    stream of checks is undone at once.
+
+    Both stacks hold at most `budget` bytes of commands, the oldest ones are
+    dropped first. Undo and redo cost the size of the command, not of the list.
+    """
+    mergeWindow = 2.0
+
+    def __init__(self, target, budget: int) -> None:
+        self.target = target
+        self.budget = budget
+        self.done: deque[Command] = deque()
+        self.undone: list[Command] = []
+        self.size = 0
+        self.replaying = False
+        # Edits after an undo or a redo start a new command
+        self.mergeable = False
+
+    @contextmanager
+    def paused(self):
+        """
+        Edits done inside are not recorded: replays and parts of a bigger command.
+        """
+        replaying, self.replaying = self.replaying, True
+        try:
+            yield
+        finally:
+            self.replaying = replaying
+
+    def push(self, command: Command) -> None:
+        if self.replaying:
+            return
+        self.size -= sum(undone.size for undone in self.undone)
+        self.undone.clear()
+        last = self.done[-1] if self.done and self.mergeable else None
+        self.mergeable = True
+        if last is not None and command.time - last.time < self.mergeWindow:
+            size = last.size
+            if last.merge(command):
+                last.time = command.time
+                self.size += last.size - size
+                self.trim()
+                return
+        self.done.append(command)
+        self.size += command.size
+        self.trim()
+
+    def trim(self) -> None:
+        while self.size > self.budget and (self.done or self.undone):
+            self.size -= (self.done.popleft() if self.done else self.undone.pop(0)).size
+
+    def clear(self) -> None:
+        self.mergeable = False
+        self.done.clear()
+        self.undone.clear()
+        self.size = 0
+
+    def undo(self) -> bool:
+        if not self.done:
+            return False
+        command = self.done.pop()
+        with self.paused():
+            command.undo(self.target)
+        self.undone.append(command)
+        self.mergeable = False
+        return True
+
+    def redo(self) -> bool:
+        if not self.undone:
+            return False
+        command = self.undone.pop()
+        size = command.size
+        with self.paused():
+            command.redo(self.target)
+        self.done.append(command)
+        self.size += command.size - size
+        self.mergeable = False
+        return True
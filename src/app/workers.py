@@ -0,0 +1,52 @@
+"""
+    Workers module: runs blocking work on a thread pool and hands the result back to the GUI thread.
+"""
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class JobSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(Exception)
+
+
+class Job(QRunnable):
+    """
+    Calls a function on a worker thread, its result or error is emitted
+    through `signals`, connected slots run on the GUI thread.
+    """
+    # Jobs are kept alive until their result has been delivered
+    running: "set[Job]" = set()
+
+    def __init__(self, function, *args) -> None:
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = JobSignals()
+        self.signals.finished.connect(self.release)
+        self.signals.failed.connect(self.release)
+
+    def release(self, *args) -> None:
+        Job.running.discard(self)
+
+    def run(self) -> None:
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+def runInBackground(function, *args, onFinished=None, onFailed=None, pool: QThreadPool | None = None) -> Job:
+    """
+    Run function(*args) on the pool (the global one by default).
+    """
+    job = Job(function, *args)
+    job.setAutoDelete(False)
+    if onFinished is not None:
+        job.signals.finished.connect(onFinished)
+    if onFailed is not None:
+        job.signals.failed.connect(onFailed)
+    Job.running.add(job)
+    (pool or QThreadPool.globalInstance()).start(job)
+    return job
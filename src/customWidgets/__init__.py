@@ -1,6 +1,9 @@
 
-__all__ = ["sideBar", "titleBar", "tab"]
+__all__ = ["sideBar", "titleBar", "tab", "iconCache", "fadeDriver", "instrumentation", "debugPanel"]
 
+from .debugPanel import DebugPanel
+from .fadeDriver import FadeDriver, fadeDriver
+from .iconCache import IconCache, cachedIcon, cachedPixmap
 from .shadowWidgets import ShadowFrame 
 from .sideBar import SideBar
 from .titleBar import CustomTitleBar
@@ -0,0 +1,65 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QHeaderView,
+    QLabel,
+    QPlainTextEdit,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+from .instrumentation import recorder
+
+
+class DebugPanel(QWidget):
+    """
+    Live view of the instrumentation: timings of the entry points and the last stalls.
+    """
+    columns = ("Entry point", "Calls", "p50 (ms)", "p90 (ms)", "Max (ms)")
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setObjectName("DebugPanel")
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+
+        self.stalls = QPlainTextEdit()
+        self.stalls.setReadOnly(True)
+
+        layout.addWidget(self.table, 2)
+        layout.addWidget(QLabel("Stalls"))
+        layout.addWidget(self.stalls, 1)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.lastStall = None
+
+    def refresh(self) -> None:
+        rows = recorder.stats()
+        self.table.setRowCount(len(rows))
+        for row, stats in enumerate(rows):
+            values = (stats["name"], str(stats["calls"]), f"{stats['p50']:.2f}",
+                      f"{stats['p90']:.2f}", f"{stats['max']:.2f}")
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+        stalls = list(recorder.stalls)
+        if stalls and stalls[-1] is not self.lastStall:
+            self.lastStall = stalls[-1]
+            self.stalls.setPlainText("\n".join(f"{seconds * 1000:.0f} ms stall in:\n{stack}"
+                                               for _, seconds, stack in reversed(stalls)))
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self.timer.stop()
@@ -0,0 +1,91 @@
+"""
+    Fade driver module: every hover fade of the application stepped by one timer.
+"""
+from PyQt5.QtCore import QElapsedTimer, QObject, QTimer, pyqtSignal
+
+
+class FadeDriver(QObject):
+    """
+    Opacity fades of painted items, keyed by any hashable value.
+
+    A fade is two dictionary entries, not an animation object: a single timer
+    steps all the running ones and `updated` tells the owners which keys to repaint.
+    Owners cancel the fades of items they no longer show with finish().
+    With reducedMotion every fade completes at once and the timer never runs.
+    """
+    updated = pyqtSignal(list)
+    reducedMotion = False
+    interval = 16
+
+    def __init__(self, duration: int = 150, parent: QObject | None = None) -> None:
+        """
+        Args:
+            duration (int): Time of a full fade, from 0 to 1, in milliseconds.
+        """
+        super().__init__(parent)
+        self.duration = duration
+        # Current opacity of the visible keys and target of the running fades
+        self.values: dict = {}
+        self.targets: dict = {}
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.interval)
+        self.timer.timeout.connect(self.step)
+
+    def fadeTo(self, key, target: float) -> None:
+        if FadeDriver.reducedMotion:
+            self.targets[key] = target
+            self.finish(key)
+            self.updated.emit([key])
+            return
+        if self.values.get(key, 0.0) == target:
+            self.targets.pop(key, None)
+            return
+        self.targets[key] = target
+        if not self.timer.isActive():
+            self.clock.start()
+            self.timer.start()
+
+    def finish(self, key) -> None:
+        """
+        Jump to the end of a fade.
+        """
+        target = self.targets.pop(key, None)
+        if target is None:
+            return
+        if target > 0:
+            self.values[key] = target
+        else:
+            self.values.pop(key, None)
+
+    def isRunning(self, key) -> bool:
+        return key in self.targets
+
+    def step(self) -> None:
+        delta = self.clock.restart() / self.duration
+        keys = list(self.targets)
+        values, targets = self.values, self.targets
+        for key in keys:
+            value, target = values.get(key, 0.0), targets[key]
+            value = min(target, value + delta) if target > value else max(target, value - delta)
+            values[key] = value
+            if value == target:
+                self.finish(key)
+        if not targets:
+            self.timer.stop()
+        self.updated.emit(keys)
+
+    def value(self, key) -> float:
+        return self.values.get(key, 0.0)
+
+
+_fadeDriver: FadeDriver | None = None
+
+def fadeDriver() -> FadeDriver:
+    """
+    The fade driver shared by every widget.
+    """
+    global _fadeDriver
+    if _fadeDriver is None:
+        _fadeDriver = FadeDriver()
+    return _fadeDriver
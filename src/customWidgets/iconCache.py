@@ -0,0 +1,73 @@
+"""
+    Icon cache module: qtawesome icons rendered once and shared by every widget.
+"""
+from collections import OrderedDict
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QGuiApplication, QIcon, QPixmap
+
+
+class IconCache:
+    """
+    Least recently used cache of qtawesome glyphs rendered to pixmaps, keyed by (name, color, size).
+
+    qtawesome icons draw their font glyph again every time they are painted,
+    cached pixmaps and the static icons built on them are only blitted.
+    """
+
+    def __init__(self, maxSize: int = 256) -> None:
+        self.maxSize = maxSize
+        self.pixmaps: OrderedDict[tuple, QPixmap] = OrderedDict()
+        self.icons: OrderedDict[tuple, QIcon] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.pixmaps.clear()
+        self.icons.clear()
+
+    def icon(self, name: str, color: str = "white", size: int = 16) -> QIcon:
+        """
+        Static icon holding the pixmap of the glyph at the given size.
+        """
+        key = (name, color, size)
+        cached = self.icons.get(key)
+        if cached is not None:
+            self.icons.move_to_end(key)
+            return cached
+        cached = QIcon(self.pixmap(name, color, size))
+        self.store(self.icons, key, cached)
+        return cached
+
+    def pixmap(self, name: str, color: str = "white", size: int = 16) -> QPixmap:
+        """
+        Glyph rendered at size x size logical pixels, for the screen pixel ratio.
+        """
+        key = (name, color, size)
+        cached = self.pixmaps.get(key)
+        if cached is not None:
+            self.pixmaps.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        # qtawesome and its fonts load with the first icon
+        from qtawesome import icon
+        application = QGuiApplication.instance()
+        ratio = application.devicePixelRatio() if application is not None else 1.0
+        cached = icon(name, color=color).pixmap(QSize(round(size * ratio), round(size * ratio)))
+        cached.setDevicePixelRatio(ratio)
+        self.store(self.pixmaps, key, cached)
+        return cached
+
+    def store(self, cache: OrderedDict, key: tuple, value) -> None:
+        cache[key] = value
+        if len(cache) > self.maxSize:
+            cache.popitem(last=False)
+
+
+iconCache = IconCache()
+
+def cachedIcon(name: str, color: str = "white", size: int = 16) -> QIcon:
+    return iconCache.icon(name, color, size)
+
+def cachedPixmap(name: str, color: str = "white", size: int = 16) -> QPixmap:
+    return iconCache.pixmap(name, color, size)
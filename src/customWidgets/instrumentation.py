@@ -0,0 +1,159 @@
+"""
+    Instrumentation module: opt-in timing of hot paths and a GUI thread stall watchdog.
+
+    Instrumentation is on when TASKER_INSTRUMENT=1 is set before the instrumented
+    modules are imported, main.py sets it for --instrument. When off, @timed
+    returns the function itself and costs nothing at call time.
+"""
+import logging
+import os
+import sys
+import threading
+import traceback
+from collections import deque
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from os.path import join
+from time import monotonic, perf_counter
+
+LOG_PATH = join("data", "logs", "performance.log")
+
+enabled = os.environ.get("TASKER_INSTRUMENT", "") not in ("", "0")
+logger = logging.getLogger("tasker.performance")
+
+
+class Recorder:
+    """
+    Recent durations of each timed entry point, shared by all threads.
+    """
+
+    def __init__(self, window: int = 1000, slowCall: float = 0.016) -> None:
+        """
+        Args:
+            window (int): Durations kept per entry point for the percentiles.
+            slowCall (float): Calls longer than this, in seconds, are logged.
+        """
+        self.window = window
+        self.slowCall = slowCall
+        self.lock = threading.Lock()
+        self.durations: dict[str, deque] = {}
+        self.calls: dict[str, int] = {}
+        self.stalls: deque = deque(maxlen=50)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self.lock:
+            durations = self.durations.get(name)
+            if durations is None:
+                durations = self.durations[name] = deque(maxlen=self.window)
+            durations.append(seconds)
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if seconds > self.slowCall:
+            logger.info("slow call %s %.1f ms", name, seconds * 1000)
+
+    def recordStall(self, seconds: float, stack: str) -> None:
+        with self.lock:
+            self.stalls.append((monotonic(), seconds, stack))
+        logger.warning("GUI thread stalled for %.0f ms in:\n%s", seconds * 1000, stack)
+
+    def stats(self) -> list[dict]:
+        """
+        Calls, p50, p90 and max in milliseconds of every entry point, slowest p90 first.
+        """
+        with self.lock:
+            snapshot = {name: sorted(durations) for name, durations in self.durations.items()}
+            calls = dict(self.calls)
+        rows = []
+        for name, durations in snapshot.items():
+            last = len(durations) - 1
+            rows.append({
+                "name": name,
+                "calls": calls[name],
+                "p50": durations[last // 2] * 1000,
+                "p90": durations[last * 9 // 10] * 1000,
+                "max": durations[last] * 1000,
+            })
+        return sorted(rows, key=lambda row: row["p90"], reverse=True)
+
+
+recorder = Recorder()
+
+
+def timed(name: str | None = None):
+    """
+    Decorator recording the duration of each call when instrumentation is enabled.
+    """
+    def decorate(function):
+        if not enabled:
+            return function
+        label = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                recorder.record(label, perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def startLog(logPath: str = LOG_PATH) -> None:
+    """
+    Write slow calls and stalls to a rolling log file.
+    """
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(logPath), exist_ok=True)
+        handler = RotatingFileHandler(logPath, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+class StallWatchdog(threading.Thread):
+    """
+    Detects GUI thread stalls: a Qt timer on the GUI thread beats every `interval`,
+    this thread checks the beats and, once they stop for more than `threshold`,
+    captures the Python stack of the GUI thread. The stall is recorded when it ends.
+    """
+
+    def __init__(self, threshold: float = 0.2, interval: float = 0.05) -> None:
+        """
+        Args:
+            threshold (float): Seconds without a beat counted as a stall.
+            interval (float): Seconds between beats and between checks.
+        """
+        super().__init__(name="StallWatchdog", daemon=True)
+        from PyQt5.QtCore import QTimer
+        self.threshold = threshold
+        self.interval = interval
+        self.guiThreadId = threading.get_ident()
+        self.lastBeat = monotonic()
+        self.stack: str | None = None
+        self.stopped = threading.Event()
+
+        self.timer = QTimer()
+        self.timer.setInterval(int(interval * 1000))
+        self.timer.timeout.connect(self.beat)
+
+    def beat(self) -> None:
+        now = monotonic()
+        if self.stack is not None:
+            # The stall ended, it lasted since the last beat
+            recorder.recordStall(now - self.lastBeat, self.stack)
+            self.stack = None
+        self.lastBeat = now
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            if self.stack is None and monotonic() - self.lastBeat > self.threshold:
+                frame = sys._current_frames().get(self.guiThreadId)
+                self.stack = "".join(traceback.format_stack(frame)) if frame is not None else "unknown"
+
+    def start(self) -> None:
+        self.timer.start()
+        super().start()
+
+    def stop(self) -> None:
+        self.timer.stop()
+        self.stopped.set()
@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (
     QPushButton, 
     QVBoxLayout
 )
-from qtawesome import icon
+from .iconCache import cachedIcon
 from .shadowWidgets import ShadowFrame
 
 class SideBar(QFrame):
@@ -28,19 +28,25 @@ class SideBar(QFrame):
         layout.setContentsMargins(0, 20, 0, 0)
 
         self.homeBtn = QPushButton()
-        self.homeBtn.setIcon(icon("fa5s.home", color="white"))
+        self.homeBtn.setIcon(cachedIcon("fa5s.home"))
         self.homeBtn.setObjectName("SidebarButton")
         self.homeBtn.setFixedSize(btnFrame.width(), btnFrame.width())
         layout.addWidget(self.homeBtn)
 
         self.taskListsBtn = QPushButton()
-        self.taskListsBtn.setIcon(icon("fa5s.folder", color="white"))
+        self.taskListsBtn.setIcon(cachedIcon("fa5s.folder"))
         self.taskListsBtn.setObjectName("SidebarButton")
         self.taskListsBtn.setFixedSize(btnFrame.width(), btnFrame.width())
         layout.addWidget(self.taskListsBtn)
 
+        self.searchBtn = QPushButton()
+        self.searchBtn.setIcon(cachedIcon("fa5s.search"))
+        self.searchBtn.setObjectName("SidebarButton")
+        self.searchBtn.setFixedSize(btnFrame.width(), btnFrame.width())
+        layout.addWidget(self.searchBtn)
+
         self.taskCheckBtn = QPushButton()
-        self.taskCheckBtn.setIcon(icon("fa5s.check-circle", color="white"))
+        self.taskCheckBtn.setIcon(cachedIcon("fa5s.check-circle"))
         self.taskCheckBtn.setObjectName("SidebarButton")
         self.taskCheckBtn.setFixedSize(btnFrame.width(), btnFrame.width())
         layout.addWidget(self.taskCheckBtn)
@@ -48,13 +54,13 @@ class SideBar(QFrame):
         layout.addStretch() 
 
         self.settingsBtn = QPushButton()
-        self.settingsBtn.setIcon(icon("fa5s.cog", color="white"))
+        self.settingsBtn.setIcon(cachedIcon("fa5s.cog"))
         self.settingsBtn.setObjectName("SidebarButton")
         self.settingsBtn.setFixedSize(btnFrame.width(), btnFrame.width())
         layout.addWidget(self.settingsBtn)
 
         self.addItemBtn = QPushButton()
-        self.addItemBtn.setIcon(icon("fa5s.plus-circle", color="white"))
+        self.addItemBtn.setIcon(cachedIcon("fa5s.plus-circle"))
         self.addItemBtn.setObjectName("AddItemButton")
         self.addItemBtn.setFixedSize(btnFrame.width(), btnFrame.width())
         layout.addWidget(self.addItemBtn)
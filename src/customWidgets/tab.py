@@ -1,6 +1,8 @@
 from PyQt5.QtWidgets import QTabWidget, QTabBar, QWidget
-from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPainterPath, QFontMetrics
-from PyQt5.QtCore import Qt, QSize, QVariantAnimation, QEasingCurve, QRect
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPainterPath, QFontMetrics, QStaticText
+from PyQt5.QtCore import Qt, QSize, QVariantAnimation, QEasingCurve, QEvent, QPointF, QRect
+from .fadeDriver import FadeDriver
+from .instrumentation import timed
 
 
 class CustomTabBar(QTabBar):
@@ -19,6 +21,7 @@ class CustomTabBar(QTabBar):
         self.activeColor = QColor(activeColor)
         self.inactiveColor = QColor(inactiveColor)
         self.hoverColor = QColor(hoverColor)
+        self.textColor = QColor(Qt.GlobalColor.white)
 
         self.borderWidth = borderWidth
         
@@ -30,12 +33,22 @@ class CustomTabBar(QTabBar):
 
 
         self.hoverIndex = -1
+        # Tab fading out after the mouse left it, repainted with the hovered one
+        self.fadingIndex = -1
         self.hoverAnim = QVariantAnimation(self)
         self.hoverAnim.setDuration(150)
+        self.hoverAnim.setStartValue(0.0)
+        self.hoverAnim.setEndValue(1.0)
         self.hoverAnim.setEasingCurve(QEasingCurve.Type.InOutCubic)
-        self.hoverAnim.valueChanged.connect(self.update)
+        self.hoverAnim.valueChanged.connect(self.updateHoverTabs)
         self.hoverProgress = 0.0
 
+        # Tab shapes by (rect, corner radii) and texts by (text, bold), dropped on layout changes
+        self.shapes: dict[tuple, QPainterPath] = {}
+        self.texts: dict[tuple, QStaticText] = {}
+        self.fonts = {}
+        self.updateFonts()
+
         self.setMouseTracking(True)
         self.setUsesScrollButtons(False)
         self.setExpanding(False)
@@ -43,6 +56,16 @@ class CustomTabBar(QTabBar):
         self.setMovable(True)
         self.setContentsMargins(0, 0, 0, 0)
 
+    def setColors(self, activeColor, inactiveColor, hoverColor, textColor=Qt.GlobalColor.white) -> None:
+        """
+        Change the tab colors, used when the application theme changes.
+        """
+        self.activeColor = QColor(activeColor)
+        self.inactiveColor = QColor(inactiveColor)
+        self.hoverColor = QColor(hoverColor)
+        self.textColor = QColor(textColor)
+        self.update()
+
     def tabSizeHint(self, index):
         if self.fixedTabWidth is not None:
             width = self.fixedTabWidth
@@ -53,12 +76,56 @@ class CustomTabBar(QTabBar):
 
         return QSize(width, self.fixedTabHeight)
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            self.updateFonts()
+
+    def clearCaches(self) -> None:
+        self.shapes.clear()
+        self.texts.clear()
+
+    def resizeEvent(self, event):
+        self.clearCaches()
+        super().resizeEvent(event)
+
+    def tabInserted(self, index):
+        self.clearCaches()
+        super().tabInserted(index)
+
+    def tabLayoutChange(self):
+        self.clearCaches()
+        super().tabLayoutChange()
+
+    def tabRemoved(self, index):
+        self.clearCaches()
+        super().tabRemoved(index)
+
+    def updateFonts(self) -> None:
+        # Active tabs have a bold label
+        self.fonts = {}
+        for bold in (False, True):
+            font = QFont(self.font())
+            font.setBold(bold)
+            self.fonts[bold] = font
+        self.texts = {}
+
+    def updateHoverTabs(self, value=None) -> None:
+        """
+        Repaint the tabs taking part in the hover fade only.
+        """
+        for idx in (self.hoverIndex, self.fadingIndex):
+            if 0 <= idx < self.count():
+                self.update(self.tabRect(idx))
+
     def enterEvent(self, event):
         super().enterEvent(event)
         self.update()
 
     def leaveEvent(self, event):
+        self.fadingIndex = self.hoverIndex
         self.hoverIndex = -1
+        self.hoverAnim.setDuration(0 if FadeDriver.reducedMotion else 150)
         self.hoverAnim.setDirection(self.hoverAnim.Backward)
         self.hoverAnim.start()
         super().leaveEvent(event)
@@ -66,7 +133,10 @@ class CustomTabBar(QTabBar):
     def mouseMoveEvent(self, event):
         idx = self.tabAt(event.pos())
         if idx != self.hoverIndex:
+            self.fadingIndex = self.hoverIndex
             self.hoverIndex = idx
+            self.updateHoverTabs()
+            self.hoverAnim.setDuration(0 if FadeDriver.reducedMotion else 150)
             self.hoverAnim.setDirection(self.hoverAnim.Forward)
             self.hoverAnim.start()
         super().mouseMoveEvent(event)
@@ -86,50 +156,74 @@ class CustomTabBar(QTabBar):
         path.closeSubpath()
         return path
 
+    def tabShape(self, rect: QRect, r1: int, r2: int, r3: int, r4: int) -> QPainterPath:
+        key = (rect.x(), rect.y(), rect.width(), rect.height(), r1, r2, r3, r4)
+        path = self.shapes.get(key)
+        if path is None:
+            path = self.shapes[key] = self.roundedRectPath(rect, r1, r2, r3, r4)
+        return path
+
+    def tabStaticText(self, text: str, bold: bool) -> QStaticText:
+        key = (text, bold)
+        staticText = self.texts.get(key)
+        if staticText is None:
+            staticText = self.texts[key] = QStaticText(text)
+            staticText.setTextFormat(Qt.TextFormat.PlainText)
+            staticText.prepare(font=self.fonts[bold])
+        return staticText
+
+    @timed("CustomTabBar.paintEvent")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         current = self.currentIndex()
+        # Hover frames only invalidate the tabs they change
+        dirty = event.rect()
+        hoverAlpha = self.hoverAnim.currentValue() or 0
+        transparent = QColor(0, 0, 0, 0)
+        borderPen = QPen(self.inactiveColor, self.borderWidth)
 
         for idx in range(self.count()):
             rect = self.tabRect(idx)
+            if not rect.intersects(dirty):
+                continue
             isActive = (idx == current)
+            hovered = idx == self.hoverIndex or idx == self.fadingIndex
 
-            
             if isActive:
                 r1, r2, r3, r4 = self.radius, self.radius, 0, 0
             elif idx == current - 1:
                 r1, r2, r3, r4 = 0, 0, self.radius, 0
             elif idx == current + 1:
                 r1, r2, r3, r4 = 0, 0, 0, self.radius
-            elif idx == self.hoverIndex:
+            elif hovered:
                 r1 = r2 = r3 = r4 = self.radius
             else:
                 r1 = r2 = r3 = r4 = 0
-            
 
             if isActive:
                 color = self.activeColor
-            elif idx == self.hoverIndex:
+            elif hovered:
                 color = QColor(self.hoverColor)
-                color.setAlphaF(self.hoverAnim.currentValue() or 0)
+                # Leaving the bar plays the fade backward, moving to another tab crossfades
+                fading = hoverAlpha if self.hoverIndex == -1 else 1 - hoverAlpha
+                color.setAlphaF(hoverAlpha if idx == self.hoverIndex else fading)
             else:
-                color = self.inactiveColor if (idx == current - 1 or idx == current + 1) else QColor(0, 0, 0, 0)
-
-            path = self.roundedRectPath(rect, r1, r2, r3, r4)
+                color = self.inactiveColor if (idx == current - 1 or idx == current + 1) else transparent
 
             painter.setPen(Qt.NoPen)
             painter.setBrush(color)
-            painter.drawPath(path)
+            painter.drawPath(self.tabShape(rect, r1, r2, r3, r4))
 
-            painter.setPen(QPen(self.inactiveColor, self.borderWidth))
+            painter.setPen(borderPen)
             painter.drawLine(rect.topLeft(), rect.topRight())
 
-            painter.setPen(Qt.GlobalColor.white)
-            font = QFont()
-            font.setBold(isActive)
-            painter.setFont(font)
-            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, self.tabText(idx))
+            staticText = self.tabStaticText(self.tabText(idx), isActive)
+            size = staticText.size()
+            painter.setPen(self.textColor)
+            painter.setFont(self.fonts[isActive])
+            painter.drawStaticText(QPointF(rect.x() + (rect.width() - size.width()) / 2,
+                                           rect.y() + (rect.height() - size.height()) / 2), staticText)
 
         painter.end()
 
@@ -6,8 +6,8 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
 )
 from qframelesswindow import TitleBarBase
-from qtawesome import icon
 # Locals importations
+from .iconCache import cachedIcon
 from .tab import CustomTabWidget
 
 class CustomTitleBar(QFrame, TitleBarBase):
@@ -42,7 +42,7 @@ class CustomTitleBar(QFrame, TitleBarBase):
         layout.setSpacing(0)
 
         self.checkBtn = QPushButton("")
-        self.checkBtn.setIcon(icon("fa5s.check", color="white"))
+        self.checkBtn.setIcon(cachedIcon("fa5s.check"))
         self.checkBtn.setObjectName("Icon")
         self.checkBtn.setFixedSize(70, 40)
         layout.addWidget(self.checkBtn)
@@ -62,21 +62,21 @@ class CustomTitleBar(QFrame, TitleBarBase):
         layout.addStretch() 
 
         self.minButton = QPushButton("")
-        self.minButton.setIcon(icon("fa5s.window-minimize", color="white"))
+        self.minButton.setIcon(cachedIcon("fa5s.window-minimize"))
         self.minButton.setObjectName("MinButton")
         self.minButton.setFixedSize(self.height(), self.height())
         self.minButton.clicked.connect(self.window().showMinimized)
         layout.addWidget(self.minButton)
 
         self.maxRestoreButton = QPushButton("")
-        self.maxRestoreButton.setIcon(icon("mdi.window-maximize", color="white"))
+        self.maxRestoreButton.setIcon(cachedIcon("mdi.window-maximize"))
         self.maxRestoreButton.setObjectName("MaxRestoreButton")
         self.maxRestoreButton.setFixedSize(self.height(), self.height())
         self.maxRestoreButton.clicked.connect(self.maximizeRestoreWindow)
         layout.addWidget(self.maxRestoreButton)
 
         self.closeButton = QPushButton("")
-        self.closeButton.setIcon(icon("mdi.close", color="white"))
+        self.closeButton.setIcon(cachedIcon("mdi.close"))
         self.closeButton.setObjectName("CloseButton")
         self.closeButton.setFixedSize(self.height(), self.height())
         self.closeButton.clicked.connect(self.window().close)
@@ -86,6 +86,6 @@ class CustomTitleBar(QFrame, TitleBarBase):
 
     def updateMaxRestoreButton(self) -> None:
         if self.window().isMaximized():
-            self.maxRestoreButton.setIcon(icon("mdi.window-restore", color="white"))
+            self.maxRestoreButton.setIcon(cachedIcon("mdi.window-restore"))
         else:
-            self.maxRestoreButton.setIcon(icon("mdi.window-maximize", color="white"))
\ No newline at end of file
+            self.maxRestoreButton.setIcon(cachedIcon("mdi.window-maximize"))
\ No newline at end of file
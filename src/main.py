@@ -1,8 +1,89 @@
 """
     Tasker is a simple task manager with basic functionnalities and a specifible design.
+
+    Run with --startup-trace to print how long imports, window construction
+    and the first paint took, with --instrument to time the hot paths, watch for
+    GUI thread stalls and open the debug panel with Ctrl+Shift+D.
 """
-from app import Tasker
+import os
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+
+START = perf_counter()
+STARTUP_BUDGET_MS = 400
+
+
+class StartupTrace:
+    """
+    Startup phase timeline, each phase is timed from the end of the previous one.
+    """
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        self.phases.append((phase, perf_counter()))
+
+    def report(self) -> None:
+        previous = self.start
+        print("Startup trace:", file=sys.stderr)
+        for phase, time in self.phases:
+            print(f"  {phase:<20} {(time - previous) * 1000:8.1f} ms", file=sys.stderr)
+            previous = time
+        total = (previous - self.start) * 1000
+        print(f"  {'time to first paint':<20} {total:8.1f} ms", file=sys.stderr)
+        if total > STARTUP_BUDGET_MS:
+            print(f"  over the {STARTUP_BUDGET_MS} ms budget", file=sys.stderr)
+        sys.stderr.flush()
+
+    def watchFirstPaint(self, window) -> None:
+        """
+        Report once the window content has been painted for the first time.
+        """
+        from PyQt5.QtCore import QEvent, QObject
+
+        trace = self
+
+        class FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event) -> bool:
+                if event.type() == QEvent.Type.Paint:
+                    obj.removeEventFilter(self)
+                    trace.mark("first paint")
+                    trace.report()
+                return False
+
+        self.filter = FirstPaintFilter(window)
+        window.centralWidget().installEventFilter(self.filter)
+
+
+def parseArguments():
+    parser = ArgumentParser(description="Tasker")
+    parser.add_argument("--startup-trace", action="store_true", help="print the startup phase timeline")
+    parser.add_argument("--instrument", action="store_true", help="time hot paths and detect GUI thread stalls")
+    parser.add_argument("--stall-threshold", type=int, default=200, metavar="MS",
+                        help="GUI thread stall threshold in milliseconds")
+    # Unknown arguments are left to Qt
+    return parser.parse_known_args()[0]
+
 
 if __name__ == "__main__":
+    arguments = parseArguments()
+    trace = StartupTrace(START) if arguments.startup_trace else None
+    if arguments.instrument:
+        # Read by the instrumentation module when the timed modules are imported
+        os.environ["TASKER_INSTRUMENT"] = "1"
+    from app import Tasker
+    if trace:
+        trace.mark("imports")
     tasker = Tasker()
-    tasker.mainLoop()
\ No newline at end of file
+    if trace:
+        trace.mark("window construction")
+        trace.watchFirstPaint(tasker)
+    if arguments.instrument:
+        from customWidgets.instrumentation import StallWatchdog, startLog
+        startLog()
+        watchdog = StallWatchdog(arguments.stall_threshold / 1000)
+        watchdog.start()
+    tasker.mainLoop()
@@ -0,0 +1,87 @@
+"""
+    Hibernation tests: a hibernated list restored after tasks were moved into it.
+
+    Run from the repository root: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtCore import QEvent, QEventLoop, QItemSelectionModel
+from PyQt5.QtWidgets import QApplication, QTabWidget
+
+import app.documentRegistry
+import app.searchIndex
+import app.storage
+import app.summaryIndex
+from app.documentRegistry import getDocumentRegistry
+from app.hibernation import HibernatedTaskList, TabHibernator
+from app.storage import JsonStorage, JournalStorage
+from app.taskDocument import TaskDocument
+from app.tasksList import TaskList
+
+
+@pytest.fixture(scope="module")
+def qtApp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.mark.parametrize("storageClass", [JsonStorage, JournalStorage])
+def test_restoreAfterMoveIntoHibernatedList(qtApp, tmp_path, monkeypatch, storageClass):
+    # Indexes and the registry are created again over a storage of the test folder
+    monkeypatch.chdir(tmp_path)
+    storage = storageClass(str(tmp_path))
+    monkeypatch.setattr(app.storage, "_storage", storage)
+    monkeypatch.setattr(app.documentRegistry, "_registry", None)
+    monkeypatch.setattr(app.searchIndex, "_searchIndex", None)
+    monkeypatch.setattr(app.summaryIndex, "_summaryIndex", None)
+    for name, tasks in (("A", ["A0", "A1"]), ("B", ["B0"])):
+        document = TaskDocument(name)
+        for task in tasks:
+            document.addTask(task)
+        storage.write(storage.fullSnapshot(document))
+
+    tabWidget = QTabWidget()
+    hibernator = TabHibernator(tabWidget)
+    lists = {}
+    for name in ("A", "B"):
+        lists[name] = TaskList(name)
+        lists[name].openDocument.loadNow()
+        tabWidget.addTab(lists[name], name)
+        hibernator.track(lists[name])
+    tabWidget.setCurrentIndex(1)
+    assert hibernator.hibernate(lists["A"])
+    # Deletes the hibernated view, which releases the document of A
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    QApplication.processEvents()
+    assert getDocumentRegistry().get("A") is None
+    assert "A" in hibernator.warmCache
+
+    source = lists["B"]
+    source.view.selectionModel().select(source.model.index(0, 0), QItemSelectionModel.SelectionFlag.ClearAndSelect)
+    source.moveSelection("A")
+    QApplication.processEvents()
+
+    placeholder = tabWidget.widget(0)
+    assert isinstance(placeholder, HibernatedTaskList)
+    restored = hibernator.restore(0, placeholder)
+    if restored.loadJob is not None:
+        loop = QEventLoop()
+        restored.loaded.connect(loop.quit)
+        loop.exec_()
+    assert [task.name for task in restored.document.tasks] == ["A0", "A1", "B0"]
+
+    index = restored.model.addTask("New Task")
+    restored.model.renameTask(index, "A2")
+    restored.saveToFile()
+    stored = storage.loadDocument("A")
+    assert [task.name for task in stored.tasks] == ["A0", "A1", "B0", "A2"]
+    assert len({task.id for task in stored.tasks}) == 4
+
+    for widget in (restored, source):
+        widget.saveToFile()
+        widget.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
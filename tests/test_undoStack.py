@@ -0,0 +1,59 @@
+"""
+    Undo stack tests: undoing then redoing edits of a TaskModel gives back the same list.
+
+    Run from the repository root: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+from app.taskModel import TaskModel
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_undoAddSubtaskOnCheckedTask(app):
+    model = TaskModel()
+    index = model.addTask("Task")
+    model.undoStack.mergeable = False
+    model.setChecked(index, True)
+    model.undoStack.mergeable = False
+    before = model.document.toDict()
+
+    model.addSubtask(index)
+    assert not model.document.tasks[0].done
+
+    assert model.undoStack.undo()
+    assert model.document.toDict() == before
+    assert model.stats.toDict()["doneTasks"] == 1
+
+    assert model.undoStack.redo()
+    task = model.document.tasks[0]
+    assert len(task.subtasks) == 1 and not task.done
+
+    assert model.undoStack.undo()
+    assert model.document.toDict() == before
+
+
+def test_undoEverything(app):
+    model = TaskModel()
+    first = model.addTask("First")
+    model.setChecked(first, True)
+    model.addSubtask(first)
+    second = model.addTask("Second")
+    model.renameTask(second, "Renamed")
+    model.moveTask(second, 0)
+    model.removeTask(model.index(1, 0))
+
+    while model.undoStack.undo():
+        pass
+    assert model.document.tasks == []
+    assert model.stats.toDict()["tasks"] == 0